@@ -1,16 +1,170 @@
+"""
+Print the dependency cycles of a module graph saved as a Graphviz DOT file.
+
+The DOT file is read by a small streaming parser for the plain digraph
+subset written by odoo_module_dependency_graph.py (and module.gv): node and
+edge statements with optional attribute lists, quoted IDs, attribute
+statements, subgraphs and // or # line comments. It never builds a parse
+tree, so even files with thousands of edges load in milliseconds, where
+pydot takes tens of seconds. HTML labels, ports and /* */ comments are not
+supported.
+
+Usage:
+    python circular.py [module.gv] [--max-cycles N]
+
+For large graphs, prefer "odoo_module_dependency_graph.py cycles", which
+reports one shortest cycle per group of cyclic modules instead of every
+elementary cycle.
+"""
+
+import re
+import sys
+import argparse
+from itertools import islice
+
 import networkx as nx
 from networkx.algorithms.cycles import simple_cycles
 
-# Parse the graph from the .dot file
-G = nx.drawing.nx_pydot.read_dot("module.gv")
+# IDs (quoted strings, names, numerals), edge operators and punctuation
+DOT_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[A-Za-z_\x80-\uffff][\w\x80-\uffff]*|-?(?:\.\d+|\d+(?:\.\d*)?)'
+                       r'|->|--|[{}\[\]=;,]')
+# A double quote, or an escaped character (which never opens or closes a string)
+QUOTE_OR_ESCAPE = re.compile(r'\\.|"', re.S)
+DOT_KEYWORDS = ('graph', 'digraph', 'subgraph', 'node', 'edge', 'strict')
+# Subgraphs that hold drawing decorations rather than modules
+IGNORED_SUBGRAPHS = ('cluster_legend',)
+
+
+def _logical_lines(f):
+    """Yield the lines of a DOT file, joining those inside a multi-line quoted string."""
+    pending = ''
+    in_string = False
+    for line in f:
+        pending += line
+        for match in QUOTE_OR_ESCAPE.finditer(line):
+            if match.group() == '"':
+                in_string = not in_string
+        if not in_string:
+            yield pending
+            pending = ''
+    if pending:
+        yield pending
+
+
+def _identifier(token):
+    """Return the value of an ID token, unquoted."""
+    if token.startswith('"'):
+        return token[1:-1].replace('\\"', '"')
+    return token
+
+
+def read_dot(dot_path):
+    """Read the nodes and edges of a DOT digraph.
+
+    Args:
+        dot_path: Path of the DOT file
+
+    Returns:
+        Tuple of (nodes, edges): list of node names and list of
+        (source, target) pairs, in file order
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    nodes = []
+    edges = []
+    # Names of the open subgraphs (None for the graph itself and anonymous ones)
+    subgraphs = []
+    # Header read, its opening brace not yet
+    pending_header = None
+
+    with open(dot_path, encoding='utf-8') as f:
+        for line in _logical_lines(f):
+            if line.lstrip().startswith(('//', '#')):
+                continue
+            tokens = DOT_TOKEN.findall(line)
+
+            index = 0
+            while index < len(tokens):
+                token = tokens[index]
+                following = tokens[index + 1] if index + 1 < len(tokens) else None
+                if token in ('strict', ';', ','):
+                    index += 1
+                    continue
+                if token in ('graph', 'digraph', 'subgraph') and following != '[':
+                    # Header: keyword, optional name, then the opening brace
+                    name = None
+                    index += 1
+                    if following is not None and following != '{':
+                        name = _identifier(following)
+                        index += 1
+                    pending_header = name if token == 'subgraph' else ''
+                    continue
+                if token == '{':
+                    subgraphs.append(pending_header or None)
+                    pending_header = None
+                    index += 1
+                    continue
+                if token == '}':
+                    if subgraphs:
+                        subgraphs.pop()
+                    index += 1
+                    continue
+
+                # One statement: IDs joined by edge operators, then optional attributes
+                statement = [token]
+                index += 1
+                while index + 1 < len(tokens) and tokens[index] in ('->', '--'):
+                    statement.append(tokens[index + 1])
+                    index += 2
+                if index < len(tokens) and tokens[index] == '=':
+                    # Graph attribute (key=value)
+                    index += 2
+                    continue
+                if index < len(tokens) and tokens[index] == '[':
+                    while index < len(tokens) and tokens[index] != ']':
+                        index += 1
+                    index += 1
+
+                if token in DOT_KEYWORDS and len(statement) == 1:
+                    # Default attributes: node [...], edge [...], graph [...]
+                    continue
+                if any(name in IGNORED_SUBGRAPHS for name in subgraphs):
+                    continue
+                names = [_identifier(name) for name in statement]
+                if len(names) == 1:
+                    nodes.append(names[0])
+                else:
+                    edges.extend(zip(names, names[1:]))
+    return nodes, edges
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print the dependency cycles of a module graph DOT file.')
+    parser.add_argument('dot_file', nargs='?', default='module.gv',
+                        help='Graphviz DOT file of the module graph (default: module.gv)')
+    parser.add_argument('--max-cycles', type=int, default=0,
+                        help='Stop after printing this many cycles (default: no limit)')
+    args = parser.parse_args()
+
+    try:
+        nodes, edges = read_dot(args.dot_file)
+    except OSError as e:
+        print(f"Error: cannot read {args.dot_file}: {e}")
+        sys.exit(1)
 
-# Convert the graph into a directed graph
-DG = nx.DiGraph(G)
+    # Build the directed graph
+    DG = nx.DiGraph()
+    DG.add_nodes_from(nodes)
+    DG.add_edges_from(edges)
 
-# Find cycles in the graph
-cycles = list(simple_cycles(DG))
+    # Print the cycles as they are found
+    cycles = simple_cycles(DG)
+    if args.max_cycles:
+        cycles = islice(cycles, args.max_cycles)
+    for cycle in cycles:
+        print(" -> ".join(cycle))
 
-# Print the cycles
 
-for cycle in cycles:
-    print(" -> ".join(cycle))
\ No newline at end of file
+if __name__ == "__main__":
+    main()
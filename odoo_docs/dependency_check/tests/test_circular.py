@@ -0,0 +1,42 @@
+from circular import read_dot
+
+
+def write_dot(tmp_path, lines):
+    dot_path = tmp_path / 'module.gv'
+    dot_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(dot_path)
+
+
+def test_read_dot_statements(tmp_path):
+    dot_path = write_dot(tmp_path, [
+        'strict digraph "dependencies" {',
+        '  // a comment',
+        '  # another comment',
+        '  graph [rankdir=LR];',
+        '  node [shape=box];',
+        '  rankdir=TB;',
+        '  "sale" [label="Sale", color=blue];',
+        '  sale -> account -> "base";',
+        '  stock -> base [weight=2]; website -> base',
+        '  subgraph cluster_legend { legend_a -> legend_b; }',
+        '  subgraph cluster_repo { label="Custom"; crm -> mail; }',
+        '}',
+    ])
+    nodes, edges = read_dot(dot_path)
+    assert nodes == ['sale']
+    assert edges == [('sale', 'account'), ('account', 'base'), ('stock', 'base'),
+                     ('website', 'base'), ('crm', 'mail')]
+
+
+def test_read_dot_quoted_ids(tmp_path):
+    dot_path = write_dot(tmp_path, [
+        'digraph {',
+        '  "multi',
+        'line" -> "escaped \\" quote";',
+        '  "backslash\\\\" -> base;',
+        '  // commented -> out',
+        '  after -> base;',
+        '}',
+    ])
+    nodes, edges = read_dot(dot_path)
+    assert edges == [('multi\nline', 'escaped " quote'), ('backslash\\\\', 'base'), ('after', 'base')]
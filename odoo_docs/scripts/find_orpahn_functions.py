@@ -7,11 +7,18 @@ unused functions that can potentially be removed or refactored.
 
 Features:
     - Analyzes single Python files or all files in a directory (non-recursive)
+    - Project mode (-d with --project): whole tree, one consolidated report
     - Extracts all function definitions from target Python file(s)
-    - Searches the entire codebase for function usage
+    - Indexes the entire codebase once and looks up each function's usage
+    - Caches the usage index on disk and re-tokenizes only changed files
+    - Optionally scans the codebase with a pool of worker processes (--jobs)
+    - AST mode (--ast): qualified names (Class.method) and exact references only
+    - Skips .git, node_modules, static/lib, i18n and .gitignore/.odooignore entries
     - Identifies functions that are never called (orphan functions)
     - Single file mode: Generates detailed Markdown and JSON reports
     - Directory mode: Prints results to terminal with per-file and overall summary
+    - JSON lines output (--format jsonl): one record per file, streamed as it finishes
+    - Profiling (--profile): per-phase wall time, files, bytes read and cache hits
 
 Usage:
     Single File Mode:
@@ -20,6 +27,9 @@ Usage:
     Directory Mode:
         python find_orpahn_functions.py -d <directory_path> -c <codebase_path>
     
+    Project Mode:
+        python find_orpahn_functions.py -d <root_path> --project [-c <codebase_path>] [-o <output_dir>]
+    
     Interactive Mode:
         python find_orpahn_functions.py
         
@@ -76,22 +86,43 @@ License: MIT
 
 import os
 import re
+import ast
+import sys
+import time
+import cProfile
+import contextlib
 import json
+import sqlite3
+import hashlib
+import io
 import argparse
+import textwrap
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 
+from odoo_file_utils import read_text, search_bytes, walk_files
+
 
-def extract_functions_from_file(file_path):
+def extract_functions_from_file(file_path, use_ast=False, content=None):
     """
     Extract all function definitions from a Python file.
     
-    This function scans a Python file line by line and uses regex to identify
-    function definitions (lines starting with 'def'). It captures both the
-    function name and its line number for later reference.
+    By default this function scans a Python file line by line and uses regex to
+    identify function definitions (lines starting with 'def'). In AST mode the
+    file is parsed with the ast module instead, so commented-out code and
+    docstrings are ignored and every definition gets a qualified name
+    (Class.method, outer.inner). It captures both the function name and its
+    line number for later reference.
     
     Args:
         file_path (str): Path to the Python file to analyze
+        use_ast (bool): Parse the file with the ast module instead of regex
+        content (str, optional): Source of the file when the caller has already
+                                 read it, so it is not read a second time
         
     Returns:
         list: List of tuples containing (function_name, line_number)
@@ -101,129 +132,801 @@ def extract_functions_from_file(file_path):
         >>> extract_functions_from_file('my_module.py')
         [('calculate_total', 15), ('process_data', 32), ('validate_input', 48)]
         
+        >>> extract_functions_from_file('models/sale.py', use_ast=True)
+        [('SaleOrder._compute_total', 12), ('SaleOrder.action_confirm', 30)]
+        
     Notes:
-        - Only captures top-level and class method definitions
+        - Only captures top-level and class method definitions (regex mode)
         - Line numbers are 1-indexed
-        - Handles UTF-8 encoded files
-        - Silently returns empty list on errors
+        - Handles any encoding (UTF-8 first, then fallback encodings)
+        - Returns empty list on errors
     """
+    if use_ast:
+        return extract_functions_with_ast(file_path, content)
+    
+    if content is None:
+        content = read_text(file_path)
+    if content is None:
+        print(f"Error reading file {file_path}")
+        return []
+    
     functions = []
+    # Split like open() does (\n, \r\n, \r only): str.splitlines() also breaks on
+    # form feeds and other separators, which would shift the line numbers
+    for i, line in enumerate(io.StringIO(content, newline=None), start=1):
+        # Match function definitions using regex pattern: def function_name(
+        # Pattern explanation:
+        # - def\s+ : 'def' keyword followed by one or more whitespace
+        # - (\w+)  : capture group for function name (alphanumeric + underscore)
+        # - \s*\(  : optional whitespace followed by opening parenthesis
+        match = re.search(r'def\s+(\w+)\s*\(', line)
+        if match:
+            func_name = match.group(1)  # Extract the function name from capture group
+            functions.append((func_name, i))
+    
+    return functions
+
+
+# Every identifier-like token in a file (function names, attributes, XML/JS words)
+IDENTIFIER_PATTERN = re.compile(r'\w+')
+# Function definitions: 'def' keyword followed by the function name
+DEFINITION_PATTERN = re.compile(r'\bdef\s+(\w+)')
+# Odoo field parameters whose string value names a model method
+ODOO_METHOD_KEYWORDS = ('compute', 'inverse', 'search', 'selection', 'default', 'group_expand')
+# XML attributes whose value names (or calls) model methods
+XML_METHOD_ATTRIBUTES = ('compute', 'inverse', 'onchange', 'on_change')
+# <field name="..."> records whose text is Python code or a method name (ir.cron, server actions)
+XML_CODE_FIELDS = ('code', 'function')
+# Cheap bytes-level checks run before decoding/parsing XML and JS files
+XML_REFERENCE_MARKERS = re.compile(
+    rb'<button|<function|object|compute=|inverse=|on_?change=|\st-\w|["\'](?:code|function)["\']'
+)
+JS_REFERENCE_MARKERS = re.compile(rb'call|method')
+# JS RPC calls: orm.call("model", "method"), rpc({method: "method"}), /web/dataset/call_kw/model/method
+JS_RPC_PATTERNS = (
+    # The model argument is any expression (a literal, this.props.resModel, ...)
+    re.compile(r'''\borm\s*\.\s*(?:silent\s*\.\s*)?call\s*\(\s*[^,]+,\s*(['"`])(?P<method>\w+)\1'''),
+    re.compile(r'''\bmethod\s*:\s*(['"`])(?P<method>\w+)\1'''),
+    re.compile(r'''/web/dataset/call_kw/[\w.]+/(?P<method>\w+)'''),
+)
+# File types that can reference Python functions in an Odoo codebase
+INDEXED_EXTENSIONS = ('.py', '.xml', '.js')
+# Bump whenever the tokenization changes so stale caches are rebuilt
+INDEX_CACHE_VERSION = 3
+# Persistent usage index caches live outside the analyzed codebase
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'orphan_function_finder')
+
+
+class _DefinitionCollector(ast.NodeVisitor):
+    """Collect function definitions with their qualified names, in source order."""
+    
+    def __init__(self):
+        self.scope = []
+        self.functions = []
+    
+    def visit_ClassDef(self, node):
+        self.scope.append(node.name)
+        self.generic_visit(node)
+        self.scope.pop()
+    
+    def visit_FunctionDef(self, node):
+        self.functions.append(('.'.join(self.scope + [node.name]), node.lineno))
+        self.scope.append(node.name)
+        self.generic_visit(node)
+        self.scope.pop()
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+def extract_functions_with_ast(file_path, content=None):
+    """
+    Extract function definitions from a Python file using the ast module.
+    
+    Args:
+        file_path (str): Path to the Python file to analyze
+        content (str, optional): Source of the file, if already read
+    
+    Returns:
+        list: List of (qualified_name, line_number) tuples
+              Empty list if file cannot be read or parsed
+    """
+    if content is None:
+        content = read_text(file_path)
+    if content is None:
+        print(f"Error reading file {file_path}")
+        return []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines, start=1):
-                # Match function definitions using regex pattern: def function_name(
-                # Pattern explanation:
-                # - def\s+ : 'def' keyword followed by one or more whitespace
-                # - (\w+)  : capture group for function name (alphanumeric + underscore)
-                # - \s*\(  : optional whitespace followed by opening parenthesis
-                match = re.search(r'def\s+(\w+)\s*\(', line)
-                if match:
-                    func_name = match.group(1)  # Extract the function name from capture group
-                    functions.append((func_name, i))
-    except (IOError, OSError, UnicodeDecodeError) as e:
-        print(f"Error reading file {file_path}: {e}")
+        tree = ast.parse(content, filename=file_path)
+    except (SyntaxError, ValueError) as e:
+        print(f"Error parsing file {file_path}: {e}")
         return []
     
-    return functions
+    collector = _DefinitionCollector()
+    collector.visit(tree)
+    return collector.functions
+
+
+class _ReferenceCollector(ast.NodeVisitor):
+    """Collect referenced names, leaving out the calls a function makes to itself."""
+    
+    def __init__(self):
+        self.functions = []  # names of the enclosing function definitions
+        self.references = set()
+    
+    def add(self, name):
+        # A purely recursive function is not used just because it calls itself
+        if name not in self.functions:
+            self.references.add(name)
+    
+    def visit_FunctionDef(self, node):
+        # Decorators, defaults and annotations are evaluated outside the function
+        for child in node.decorator_list + [node.args] + ([node.returns] if node.returns else []):
+            self.visit(child)
+        self.functions.append(node.name)
+        for child in node.body:
+            self.visit(child)
+        self.functions.pop()
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_Name(self, node):
+        self.add(node.id)
+    
+    def visit_Attribute(self, node):
+        value = node.value
+        if (isinstance(value, ast.Call) and isinstance(value.func, ast.Name)
+                and value.func.id == 'super'):
+            # super().method() in an override calls the parent method, not itself
+            self.references.add(node.attr)
+        else:
+            self.add(node.attr)
+        self.generic_visit(node)
+    
+    def visit_alias(self, node):
+        self.add(node.name.rsplit('.', 1)[-1])
+    
+    def visit_Call(self, node):
+        # getattr(record, 'method_name') / hasattr(record, 'method_name')
+        if (isinstance(node.func, ast.Name) and node.func.id in ('getattr', 'hasattr')
+                and len(node.args) >= 2 and isinstance(node.args[1], ast.Constant)
+                and isinstance(node.args[1].value, str)):
+            self.add(node.args[1].value)
+        # fields.Float(compute='_compute_total', inverse='_inverse_total')
+        for keyword in node.keywords:
+            if (keyword.arg in ODOO_METHOD_KEYWORDS and isinstance(keyword.value, ast.Constant)
+                    and isinstance(keyword.value.value, str)):
+                self.add(keyword.value.value)
+        self.generic_visit(node)
+
+
+def extract_references_with_ast(content):
+    """
+    Collect the names a Python source really references, using the ast module.
+    
+    References are variable names, attribute names (self.method), imported
+    names, string literals passed to getattr()/hasattr() and the method names
+    given as strings to Odoo field parameters such as compute='_compute_total'.
+    Definitions, comments and docstrings are not references, and neither are
+    the calls a function makes to itself from its own body (recursion).
+    
+    Args:
+        content (str): Python source code
+    
+    Returns:
+        set: Referenced identifiers
+        None: If the source cannot be parsed
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    
+    collector = _ReferenceCollector()
+    collector.visit(tree)
+    return collector.references
+
+
+def extract_xml_references(file_path):
+    """
+    Collect the model methods an Odoo XML file can call, streaming it with iterparse.
+    
+    Only the places where Odoo really calls Python methods are considered:
+    - <button name="..."> and any element with type="object" (kanban links)
+    - <function name="..."> data records
+    - compute=, inverse=, onchange= and on_change= attributes
+    - QWeb expressions in t-* attributes (t-esc="doc._get_lines()")
+    - the body of <field name="code"> / <field name="function"> (ir.cron,
+      server actions, automations)
+    
+    Args:
+        file_path (str): Path of the XML file
+    
+    Returns:
+        set: Referenced identifiers
+        None: If the file is not well-formed XML
+    """
+    references = set()
+    # Elements still open, so a processed element can be detached from its parent
+    open_elements = []
+    try:
+        for event, element in ET.iterparse(file_path, events=('start', 'end')):
+            if event == 'start':
+                open_elements.append(element)
+                continue
+            open_elements.pop()
+            if element.tag in ('button', 'function') or element.get('type') == 'object':
+                if element.get('name'):
+                    references.add(element.get('name'))
+            for attribute, value in element.attrib.items():
+                if attribute in XML_METHOD_ATTRIBUTES or attribute.startswith('t-'):
+                    references.update(IDENTIFIER_PATTERN.findall(value))
+            if element.tag == 'field' and element.get('name') in XML_CODE_FIELDS and element.text:
+                code = textwrap.dedent(element.text).strip()
+                code_references = extract_references_with_ast(code)
+                if code_references is None:
+                    code_references = set(IDENTIFIER_PATTERN.findall(code))
+                references.update(code_references)
+            # Drop processed elements (clearing alone would leave them attached
+            # to the root) so large data files stream in constant memory
+            if open_elements:
+                open_elements[-1].remove(element)
+    except (ET.ParseError, OSError):
+        return None
+    return references
+
+
+def extract_js_references(content):
+    """
+    Collect the model methods a JS file calls through RPC.
+    
+    Args:
+        content (str): JavaScript source code
+    
+    Returns:
+        set: Method names passed to orm.call(), rpc({method: ...}) or call_kw URLs
+    """
+    return {
+        match.group('method')
+        for pattern in JS_RPC_PATTERNS
+        for match in pattern.finditer(content)
+    }
+
+
+class PhaseProfiler:
+    """
+    Per-phase timing and I/O counters for --profile runs.
+    
+    Each phase (walk, read .py, match .py, usage lookups, reports, ...)
+    accumulates its wall time, number of calls, files opened, bytes read and
+    cache hits. A disabled profiler (the default) records nothing, so
+    instrumented code paths cost almost nothing on normal runs.
+    
+    Phases run by --jobs worker processes are recorded there and merged back
+    into the main profile with a " (workers)" suffix; their wall time adds up
+    the time spent by all workers.
+    
+    Examples:
+        >>> PROFILER.enabled = True
+        >>> with PROFILER.phase('walk'):
+        ...     files = list(walk_files(codebase_path))
+        >>> PROFILER.print_summary()
+    """
+    
+    COUNTERS = ('files', 'bytes_read', 'cache_hits')
+    
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}  # name -> {'wall': float, 'calls': int, 'files': int, ...}
+        self.trace_events = []
+        self._origin = time.perf_counter()
+    
+    def start(self, origin=None):
+        """Enable the profiler with no recorded phases, timing from `origin` (perf_counter)."""
+        self.enabled = True
+        self.phases = {}
+        self.trace_events = []
+        self._origin = time.perf_counter() if origin is None else origin
+    
+    def _stats(self, name):
+        if name not in self.phases:
+            self.phases[name] = dict({'wall': 0.0, 'calls': 0}, **{key: 0 for key in self.COUNTERS})
+        return self.phases[name]
+    
+    @contextlib.contextmanager
+    def phase(self, name, **counters):
+        """Time the enclosed block as one call of phase `name`, adding the given counters."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = self._stats(name)
+            stats['wall'] += elapsed
+            stats['calls'] += 1
+            for key, value in counters.items():
+                stats[key] += value
+            self.trace_events.append({
+                'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                'ts': round((started - self._origin) * 1e6, 3),
+                'dur': round(elapsed * 1e6, 3),
+                'args': counters,
+            })
+    
+    def add(self, name, **counters):
+        """Add counters to a phase without timing anything."""
+        if self.enabled:
+            stats = self._stats(name)
+            for key, value in counters.items():
+                stats[key] += value
+    
+    def merge(self, phases, trace_events):
+        """Add the phases recorded by a worker process (see _tokenize_file_in_worker)."""
+        for name, worker_stats in phases.items():
+            stats = self._stats(f"{name} (workers)")
+            for key, value in worker_stats.items():
+                stats[key] += value
+        self.trace_events.extend(trace_events)
+    
+    def print_summary(self):
+        """Print one row per phase, in the order phases first ran."""
+        print("=" * 86)
+        print("PROFILE")
+        print("=" * 86)
+        print(f"{'Phase':<28}{'Wall (s)':>10}{'Calls':>10}{'Files':>10}{'Bytes read':>16}{'Cache hits':>12}")
+        print("-" * 86)
+        for name, stats in self.phases.items():
+            print(f"{name:<28}{stats['wall']:>10.3f}{stats['calls']:>10}{stats['files']:>10}"
+                  f"{stats['bytes_read']:>16}{stats['cache_hits']:>12}")
+        if any(name.endswith(' (workers)') for name in self.phases):
+            print("(workers): recorded in --jobs worker processes, wall time summed over all workers")
+        print()
+    
+    def write_chrome_trace(self, trace_path):
+        """Write the recorded phases in Chrome trace format (chrome://tracing, Perfetto)."""
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events, 'displayTimeUnit': 'ms'}, f)
+
+
+# Shared profiler, enabled by --profile / --profile-output / --trace-output
+PROFILER = PhaseProfiler()
+
+
+class UsageIndex:
+    """
+    Identifier index of a codebase, built with a single walk over the tree.
+    
+    Instead of re-reading every file of the codebase for each function that is
+    checked, the index tokenizes each Python, XML and JS file once and counts in
+    how many files every identifier appears. Orphan queries are then answered
+    with dictionary lookups.
+    
+    The per-file identifier sets can be persisted in a SQLite cache keyed by
+    file path, modification time and size, so that later runs only re-tokenize
+    the files that changed since the previous run.
+    
+    In AST mode Python files are parsed with the ast module and only real
+    references are indexed (see extract_references_with_ast), so a function's
+    own definition never counts as a usage. In both modes XML and JS files
+    contribute only the method names Odoo can actually call from them (see
+    extract_xml_references and extract_js_references).
+    
+    Attributes:
+        codebase_path (str): Absolute root path of the indexed codebase
+        use_ast (bool): Whether Python files are indexed with the ast module
+        walk_options (dict): include/exclude globs and ignore rules of the traversal
+        files (set): Absolute paths of all indexed files
+        counts (Counter): Number of indexed files mentioning each identifier
+        cache_hits (int): Number of files whose identifiers came from the cache
+        files_tokenized (int): Number of files read and tokenized in this run
+    
+    Examples:
+        >>> index = UsageIndex('/project/src').build()
+        >>> index.is_used('calculate_total', '/project/src/utils.py')
+        True
+        
+        >>> index = UsageIndex('/project/src').build(cache_path=default_cache_path('/project/src'))
+    
+    Notes:
+        - Matching is done on exact identifier tokens, not substrings
+        - In the file defining a function, "def function_name" is not a usage
+        - Files that cannot be read are skipped (and not cached)
+    """
+    
+    def __init__(self, codebase_path, use_ast=False, include=(), exclude=(), use_ignore_rules=True):
+        self.codebase_path = os.path.abspath(codebase_path)
+        self.use_ast = use_ast
+        # Traversal options shared with analyze_project (see odoo_file_utils.walk_files)
+        self.walk_options = {
+            'include': tuple(include),
+            'exclude': tuple(exclude),
+            'use_ignore_rules': use_ignore_rules,
+        }
+        self.files = set()
+        self.counts = Counter()
+        self.cache_hits = 0
+        self.files_tokenized = 0
+        # (file_path, (mentions, references)) of the last file queried by is_used
+        self._file_tokens = None
+    
+    def iter_files(self):
+        """
+        Yield the absolute path of every Python, XML and JS file in the codebase.
+        
+        Ignored directories (.git, node_modules, static/lib, i18n, .gitignore and
+        .odooignore entries, --exclude globs) are pruned without being walked.
+        """
+        return walk_files(self.codebase_path, extensions=INDEXED_EXTENSIONS, **self.walk_options)
+    
+    def build(self, cache_path=None, rebuild=False, jobs=1):
+        """
+        Walk the codebase once and index every Python, XML and JS file.
+        
+        Args:
+            cache_path (str, optional): SQLite cache file to reuse and refresh.
+                                        If omitted, every file is tokenized
+            rebuild (bool): Ignore the cached entries and re-tokenize every file
+            jobs (int): Number of worker processes used to read and tokenize
+                        files. 1 tokenizes in the current process
+        
+        Returns:
+            UsageIndex: The index itself, to allow chaining
+        """
+        with PROFILER.phase('cache load'):
+            cached = load_index_cache(cache_path) if cache_path and not rebuild else {}
+        changed = {}
+        pending = []  # (file_path, signature) of files that must be tokenized
+        
+        with PROFILER.phase('walk'):
+            file_paths = list(self.iter_files())
+        
+        with PROFILER.phase('stat & cache check'):
+            for file_path in file_paths:
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                
+                entry = cached.get(file_path)
+                if entry and entry[0] == signature:
+                    self.cache_hits += 1
+                    self.add_identifiers(file_path, entry[1])
+                else:
+                    pending.append((file_path, signature))
+        PROFILER.add('stat & cache check', cache_hits=self.cache_hits)
+        
+        # Results come back in submission order, so the merged index is the
+        # same whatever the number of jobs
+        pending_paths = [file_path for file_path, _ in pending]
+        pooled = jobs > 1 and len(pending_paths) > 1
+        # The per-file phases of worker processes are merged into the profile separately
+        with PROFILER.phase('process pool') if pooled else contextlib.nullcontext():
+            tokenized = tokenize_files(pending_paths, jobs, self.use_ast)
+        for (file_path, signature), identifiers in zip(pending, tokenized):
+            if identifiers is None:
+                continue
+            self.files_tokenized += 1
+            changed[file_path] = (signature, identifiers)
+            self.add_identifiers(file_path, identifiers)
+        
+        if cache_path:
+            removed = [path for path in cached if path not in self.files]
+            with PROFILER.phase('cache save'):
+                save_index_cache(cache_path, changed, removed, clear=rebuild)
+        return self
+    
+    def add_identifiers(self, file_path, identifiers):
+        """
+        Add the identifiers mentioned by a file to the index.
+        
+        Args:
+            file_path (str): Path of the indexed file
+            identifiers (set): Identifiers mentioned in the file
+        """
+        self.files.add(os.path.abspath(file_path))
+        self.counts.update(identifiers)
+    
+    def file_tokens(self, file_path, content=None):
+        """
+        Return the identifiers mentioned and referenced in a single file.
+        
+        References are the mentions that are not only function definitions,
+        i.e. names that occur more often than they are defined with "def".
+        The functions of a file are queried one after the other, so only the
+        last file's result is kept and memory stays flat on large projects.
+        
+        Args:
+            file_path (str): Path of the file to tokenize
+            content (str, optional): Source of the file, if already read
+        
+        Returns:
+            tuple: (mentions, references) sets of identifiers
+        """
+        file_path = os.path.abspath(file_path)
+        if self._file_tokens is None or self._file_tokens[0] != file_path:
+            if content is None:
+                content = read_text(file_path) or ''
+            occurrences = Counter(IDENTIFIER_PATTERN.findall(content))
+            definitions = Counter(DEFINITION_PATTERN.findall(content))
+            references = {name for name, count in occurrences.items() if count > definitions[name]}
+            self._file_tokens = (file_path, (set(occurrences), references))
+        return self._file_tokens[1]
+    
+    def is_used(self, func_name, defining_file, content=None):
+        """
+        Check whether a function is used anywhere in the indexed codebase.
+        
+        Args:
+            func_name (str): Name of the function to look up. Qualified names
+                             (Class.method) are looked up by their last part
+            defining_file (str): Path to the file containing the function definition
+            content (str, optional): Source of defining_file, if already read
+        
+        Returns:
+            bool: True if the function is referenced somewhere in the codebase
+                  False if the function is never referenced (orphan function)
+        """
+        func_name = func_name.rsplit('.', 1)[-1]
+        defining_file = os.path.abspath(defining_file)
+        # AST references never include definitions, so no per-file correction is needed
+        if self.use_ast or defining_file not in self.files:
+            return self.counts[func_name] > 0
+        
+        mentions, references = self.file_tokens(defining_file, content)
+        # Mentions in any other indexed file count as usage
+        if self.counts[func_name] - (func_name in mentions) > 0:
+            return True
+        # Within the defining file, only non-definition occurrences count
+        return func_name in references
+
+
+def tokenize_file(file_path, use_ast=False):
+    """
+    Read a file and return the set of identifiers it mentions.
+    
+    Args:
+        file_path (str): Path of the file to tokenize
+        use_ast (bool): Index only real references of Python files. Files that
+                        cannot be parsed fall back to plain tokenization
+    
+    Notes:
+        - Profiled as "prefilter", "parse", "read" and "match" phases per
+          extension; bytes are counted only for files read in full
+        - XML and JS files are reduced to the method names Odoo calls from them;
+          malformed XML falls back to plain tokenization
+        - XML and JS files without any call marker are skipped after a
+          bytes-level search of the (memory-mapped) file
+        - Files that are not valid UTF-8 are decoded with fallback encodings
+    
+    Returns:
+        set: Identifiers mentioned in the file
+        None: If the file cannot be read
+    """
+    extension = os.path.splitext(file_path)[1]
+    if extension in ('.xml', '.js'):
+        # Most XML data files never call methods: skip them without decoding.
+        # The search stops at the first marker, so it adds no bytes read
+        with PROFILER.phase(f"prefilter {extension}", files=1):
+            found = search_bytes(file_path, XML_REFERENCE_MARKERS if extension == '.xml' else JS_REFERENCE_MARKERS)
+        if not found:
+            return set()
+    if extension == '.xml':
+        with PROFILER.phase('parse .xml', files=1, bytes_read=_file_size(file_path) if PROFILER.enabled else 0):
+            references = extract_xml_references(file_path)
+        if references is not None:
+            return references
+    
+    with PROFILER.phase(f"read {extension}", files=1,
+                        bytes_read=_file_size(file_path) if PROFILER.enabled else 0):
+        content = read_text(file_path)
+    if content is None:
+        return None
+    with PROFILER.phase(f"match {extension}"):
+        if extension == '.js':
+            return extract_js_references(content)
+        if use_ast and extension == '.py':
+            references = extract_references_with_ast(content)
+            if references is not None:
+                return references
+        return set(IDENTIFIER_PATTERN.findall(content))
+
+
+def _file_size(file_path):
+    """Return the size of a file, 0 if it cannot be read."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def _tokenize_file_in_worker(file_path, use_ast=False, origin=None):
+    """
+    Tokenize a file in a worker process under --profile.
+    
+    Forked workers inherit the main profiler, but what they record would stay
+    in their copy of it: the phases of the file are returned with the
+    identifiers instead, for PhaseProfiler.merge().
+    
+    Returns:
+        tuple: (identifiers, phases, trace_events)
+    """
+    PROFILER.start(origin)
+    identifiers = tokenize_file(file_path, use_ast)
+    return identifiers, PROFILER.phases, PROFILER.trace_events
 
 
-def search_function_usage(func_name, codebase_path, exclude_file):
+def tokenize_files(file_paths, jobs=1, use_ast=False):
+    """
+    Tokenize many files, optionally spread across a process pool.
+    
+    Args:
+        file_paths (list): Paths of the files to tokenize
+        jobs (int): Number of worker processes. 1 (or a single file) runs
+                    in the current process
+        use_ast (bool): Index Python files with the ast module
+    
+    Returns:
+        list: Identifier sets (or None for unreadable files), in the same
+              order as file_paths
+    """
+    if jobs <= 1 or len(file_paths) < 2:
+        return [tokenize_file(file_path, use_ast) for file_path in file_paths]
+    # Large chunks keep inter-process overhead low on trees with many small files
+    chunksize = max(1, len(file_paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if not PROFILER.enabled:
+            return list(executor.map(partial(tokenize_file, use_ast=use_ast), file_paths, chunksize=chunksize))
+        # Workers share the main process clock origin so the trace lines up
+        worker = partial(_tokenize_file_in_worker, use_ast=use_ast, origin=PROFILER._origin)
+        tokenized = []
+        for identifiers, phases, trace_events in executor.map(worker, file_paths, chunksize=chunksize):
+            PROFILER.merge(phases, trace_events)
+            tokenized.append(identifiers)
+        return tokenized
+
+
+def default_cache_path(codebase_path, use_ast=False):
+    """
+    Return the default usage index cache file for a codebase.
+    
+    Each codebase root (and indexing mode) gets its own cache file under
+    DEFAULT_CACHE_DIR, so running the finder again with the same -c path
+    reuses it automatically.
+    
+    Args:
+        codebase_path (str): Root path of the codebase
+        use_ast (bool): Whether the cache holds an AST-mode index
+    
+    Returns:
+        str: Path to the SQLite cache file
+    """
+    digest = hashlib.sha1(os.path.abspath(codebase_path).encode('utf-8')).hexdigest()[:16]
+    suffix = '_ast' if use_ast else ''
+    return os.path.join(DEFAULT_CACHE_DIR, f"usage_index_{digest}{suffix}.sqlite")
+
+
+def _connect_index_cache(cache_path):
+    """Open the cache database, creating the schema if needed."""
+    connection = sqlite3.connect(cache_path)
+    connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS files ("
+        "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, identifiers TEXT)"
+    )
+    return connection
+
+
+def load_index_cache(cache_path):
+    """
+    Load the per-file identifier sets stored in a usage index cache.
+    
+    Args:
+        cache_path (str): Path to the SQLite cache file
+    
+    Returns:
+        dict: {file_path: ((mtime_ns, size), identifiers)}
+              Empty dict if the cache does not exist, is unreadable or was
+              written by an incompatible version of this script
+    """
+    if not os.path.isfile(cache_path):
+        return {}
+    try:
+        connection = _connect_index_cache(cache_path)
+        try:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if not row or row[0] != str(INDEX_CACHE_VERSION):
+                return {}
+            return {
+                path: ((mtime_ns, size), set(identifiers.split()))
+                for path, mtime_ns, size, identifiers in connection.execute(
+                    "SELECT path, mtime_ns, size, identifiers FROM files")
+            }
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        print(f"Warning: ignoring unreadable index cache {cache_path}: {e}")
+        return {}
+
+
+def save_index_cache(cache_path, changed, removed, clear=False):
+    """
+    Write changed entries to the usage index cache and drop removed files.
+    
+    Args:
+        cache_path (str): Path to the SQLite cache file
+        changed (dict): {file_path: ((mtime_ns, size), identifiers)} to store
+        removed (list): Paths of files that no longer exist in the codebase
+        clear (bool): Drop all existing entries first (full rebuild)
+    """
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        connection = _connect_index_cache(cache_path)
+        try:
+            with connection:
+                row = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+                if clear or not row or row[0] != str(INDEX_CACHE_VERSION):
+                    connection.execute("DELETE FROM files")
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                                   (str(INDEX_CACHE_VERSION),))
+                connection.executemany("DELETE FROM files WHERE path = ?",
+                                       [(path,) for path in removed])
+                connection.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                    [(path, mtime_ns, size, ' '.join(sorted(identifiers)))
+                     for path, ((mtime_ns, size), identifiers) in changed.items()]
+                )
+        finally:
+            connection.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: could not write index cache {cache_path}: {e}")
+
+
+def search_function_usage(func_name, codebase_path, exclude_file, index=None):
     """
     Search for function usage across the entire codebase.
     
-    This function recursively searches all Python and XML files in the codebase directory
-    to find any occurrence of the specified function being called. It uses different
-    search strategies based on file type:
-    - Analyzed file: Searches for function calls but excludes the definition line
-    - Python files: Searches for "function_name(" pattern
-    - XML files: Searches for the function name (common in Odoo views/actions)
+    This function looks up the function name in a UsageIndex of all Python, XML
+    and JS files in the codebase directory. The index is built once and shared
+    between queries, so checking many functions does not re-read the codebase:
+    - Analyzed file: Any occurrence of the name except its "def" line counts as usage
+    - Python files: Any occurrence of the name as an identifier counts as usage
+    - XML files: Buttons, compute/inverse/onchange attributes, QWeb expressions,
+      <function> records and ir.cron / server action code
+    - JS files: RPC method names (orm.call, rpc method:, call_kw URLs)
     
     Args:
         func_name (str): Name of the function to search for
         codebase_path (str): Root path of the codebase to search in
         exclude_file (str): Path to the file containing the function definition
                            (will be searched but definition line excluded)
+        index (UsageIndex, optional): Prebuilt index of codebase_path. If omitted,
+                                      a new index is built for this single query
     
     Returns:
         bool: True if the function is called somewhere in the codebase
               False if the function is never called (orphan function)
     
     Examples:
-        >>> search_function_usage('calculate_total', '/project/src', '/project/src/utils.py')
+        >>> index = UsageIndex('/project/src').build()
+        >>> search_function_usage('calculate_total', '/project/src', '/project/src/utils.py', index)
         True  # Function is used somewhere
         
-        >>> search_function_usage('old_helper', '/project/src', '/project/src/helpers.py')
+        >>> search_function_usage('old_helper', '/project/src', '/project/src/helpers.py', index)
         False  # Function is orphaned
     
     Notes:
-        - Python files: Searches for "function_name(" to identify function calls
-        - XML files: Searches for the function name (e.g., in button name attributes)
-        - Analyzed file: Uses regex to exclude "def function_name(" but find "function_name("
-        - Recursively searches all .py and .xml files in the codebase
-        - Skips files that cannot be read (permission errors, encoding issues)
+        - Matches exact identifier tokens, so "compute" is not found in "_compute_total"
+        - Recursively indexes all .py, .xml and .js files in the codebase
+        - Skips files that cannot be read (permission errors); other encodings are decoded
         - Case-sensitive search
         - May have false negatives if function is called dynamically (getattr, eval, etc.)
     """
-    # Build search pattern: function_name followed by opening parenthesis
-    search_pattern = f"{func_name}"
-    
-    # Regex pattern to find function calls but exclude definitions
-    # Negative lookbehind ensures "def " is not before the function name
-    call_pattern = re.compile(rf'(?<!def\s)\b{re.escape(func_name)}\s*')
-    
-    # Convert exclude_file to absolute path for accurate comparison
-    exclude_file_abs = os.path.abspath(exclude_file)
-    
-    codebase_path = Path(codebase_path)
-    
-    # Search all Python files in the codebase recursively
-    for py_file in codebase_path.rglob('*.py'):
-        py_file_abs = os.path.abspath(py_file)
-        
-        try:
-            with open(py_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # Special handling for the analyzed file itself
-                if py_file_abs == exclude_file_abs:
-                    # Use regex to find function calls but exclude definition lines
-                    if call_pattern.search(content):
-                        return True  # Function is called within its own file
-                else:
-                    # For other Python files, use simple string search
-                    if search_pattern in content:
-                        return True  # Function is used in another Python file
-        except (IOError, OSError, UnicodeDecodeError):
-            # Skip files that can't be read (permissions, encoding issues, etc.)
-            continue
-    
-    # Search all XML files in the codebase recursively
-    for xml_file in codebase_path.rglob('*.xml'):
-        try:
-            with open(xml_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # In XML files, search for the function name without requiring parenthesis
-                # Common in Odoo: <button name="func_name"/> or <field name="func_name"/>
-                if func_name in content:
-                    return True  # Function name found in XML file
-        except (IOError, OSError, UnicodeDecodeError):
-            # Skip files that can't be read (permissions, encoding issues, etc.)
-            continue
-    for xml_file in codebase_path.rglob('*.js'):
-        try:
-            with open(xml_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # In XML files, search for the function name without requiring parenthesis
-                # Common in Odoo: <button name="func_name"/> or <field name="func_name"/>
-                if func_name in content:
-                    return True  # Function name found in XML file
-        except (IOError, OSError, UnicodeDecodeError):
-            # Skip files that can't be read (permissions, encoding issues, etc.)
-            continue
-    
-    # Function was not found in any file - it's an orphan
-    return False
+    if index is None:
+        index = UsageIndex(codebase_path).build()
+    return index.is_used(func_name, exclude_file)
 
 
 def add_todo_to_orphans(file_path, orphan_lines):
@@ -309,6 +1012,7 @@ def generate_markdown_report(target_file, codebase_path, all_functions, orphan_f
         target_file (str): Path to the analyzed Python file
         codebase_path (str): Root path of the codebase that was searched
         all_functions (list): List of all (function_name, line_number) tuples
+                              (project mode names are "relative/path.py:function_name")
         orphan_functions (list): List of orphan (function_name, line_number) tuples
         output_dir (str, optional): Directory to save the report. Defaults to analyzed file's directory
     
@@ -444,6 +1148,7 @@ def generate_json_report(target_file, codebase_path, all_functions, orphan_funct
         target_file (str): Path to the analyzed Python file
         codebase_path (str): Root path of the codebase that was searched
         all_functions (list): List of all (function_name, line_number) tuples
+                              (project mode names are "relative/path.py:function_name")
         orphan_functions (list): List of orphan (function_name, line_number) tuples
         output_dir (str, optional): Directory to save the report. Defaults to analyzed file's directory
     
@@ -546,7 +1251,74 @@ def generate_json_report(target_file, codebase_path, all_functions, orphan_funct
         return None
 
 
-def analyze_directory(directory_path, codebase_path):
+def build_file_record(file_path, functions, orphan_functions, elapsed):
+    """
+    Build the JSON lines record describing the analysis of one file.
+    
+    Args:
+        file_path (str): Path of the analyzed file
+        functions (list): All (function_name, line_number) tuples of the file
+        orphan_functions (list): Orphan (function_name, line_number) tuples
+        elapsed (float): Time spent analyzing the file, in seconds
+    
+    Returns:
+        dict: {"type": "file", "file", "functions", "orphans", "function_count",
+               "orphan_count", "elapsed_seconds"}
+    """
+    orphan_set = {func_name for func_name, _ in orphan_functions}
+    return {
+        'type': 'file',
+        'file': os.path.abspath(file_path),
+        'functions': [
+            {'name': func_name, 'line_number': line_num, 'is_orphan': func_name in orphan_set}
+            for func_name, line_num in functions
+        ],
+        'orphans': [
+            {'name': func_name, 'line_number': line_num}
+            for func_name, line_num in orphan_functions
+        ],
+        'function_count': len(functions),
+        'orphan_count': len(orphan_functions),
+        'elapsed_seconds': round(elapsed, 6),
+    }
+
+
+def write_jsonl_record(stream, record):
+    """Write one JSON record on its own line and flush it for incremental consumers."""
+    stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def load_usage_index(codebase_path, use_cache=True, rebuild=False, jobs=1, use_ast=False,
+                     include=(), exclude=(), use_ignore_rules=True):
+    """
+    Build the usage index for a codebase, reusing the persistent cache.
+    
+    Args:
+        codebase_path (str): Root path of the codebase to index
+        use_cache (bool): Read and refresh the cache at default_cache_path()
+        rebuild (bool): Discard cached entries and re-tokenize every file
+        jobs (int): Number of worker processes used to tokenize files
+        use_ast (bool): Index Python files with the ast module
+        include (tuple): Only index files matching these globs (relative paths)
+        exclude (tuple): Skip files and directories matching these globs
+        use_ignore_rules (bool): Prune default vendored directories and honor
+                                 .gitignore / .odooignore files
+    
+    Returns:
+        UsageIndex: The built index
+    """
+    cache_path = default_cache_path(codebase_path, use_ast) if use_cache else None
+    print("Indexing codebase...")
+    index = UsageIndex(codebase_path, use_ast, include, exclude, use_ignore_rules)
+    index.build(cache_path=cache_path, rebuild=rebuild, jobs=jobs)
+    print(f"Indexed {len(index.files)} file(s): {index.files_tokenized} tokenized, "
+          f"{index.cache_hits} from cache.")
+    print()
+    return index
+
+
+def analyze_directory(directory_path, codebase_path, index=None, use_ast=False, record_stream=None):
     """
     Analyze all Python files in a directory for orphan functions.
     
@@ -557,6 +1329,13 @@ def analyze_directory(directory_path, codebase_path):
     Args:
         directory_path (str): Path to the directory containing Python files to analyze
         codebase_path (str): Root path of the codebase to search for function usage
+        index (UsageIndex, optional): Prebuilt index of codebase_path. If omitted,
+                                      it is built once for all files of the directory
+        use_ast (bool): Use the ast module for extraction and indexing when the
+                        index is built here (a prebuilt index sets its own mode)
+        record_stream (file, optional): When given, one JSON record per analyzed
+                                        file is written (and flushed) to it as soon
+                                        as the file is done, then a summary record
     
     Returns:
         dict: Summary statistics containing:
@@ -585,6 +1364,10 @@ def analyze_directory(directory_path, codebase_path):
     print(f"Found {len(py_files)} Python file(s) in directory.")
     print()
     
+    # Index the codebase once and share it between all analyzed files
+    if index is None:
+        index = UsageIndex(codebase_path, use_ast).build()
+    
     # Track overall statistics
     total_files = 0
     total_functions_count = 0
@@ -594,13 +1377,18 @@ def analyze_directory(directory_path, codebase_path):
     for py_file in py_files:
         py_file_path = str(py_file)
         file_name = py_file.name
+        started = time.perf_counter()
         
         print(f"Analyzing: {file_name}")
         
         # Extract functions from the file
-        functions = extract_functions_from_file(py_file_path)
+        with PROFILER.phase('extract definitions', files=1):
+            functions = extract_functions_from_file(py_file_path, use_ast=index.use_ast)
         
         if not functions:
+            if record_stream:
+                write_jsonl_record(record_stream, build_file_record(
+                    py_file_path, [], [], time.perf_counter() - started))
             print("  No functions found")
             print("---")
             print()
@@ -609,10 +1397,15 @@ def analyze_directory(directory_path, codebase_path):
         
         # Find orphan functions
         orphan_functions = []
-        for func_name, line_num in functions:
-            is_used = search_function_usage(func_name, codebase_path, py_file_path)
-            if not is_used:
-                orphan_functions.append((func_name, line_num))
+        with PROFILER.phase('usage lookups'):
+            for func_name, line_num in functions:
+                is_used = search_function_usage(func_name, codebase_path, py_file_path, index)
+                if not is_used:
+                    orphan_functions.append((func_name, line_num))
+        
+        if record_stream:
+            write_jsonl_record(record_stream, build_file_record(
+                py_file_path, functions, orphan_functions, time.perf_counter() - started))
         
         # Display orphan functions for this file
         if orphan_functions:
@@ -640,11 +1433,104 @@ def analyze_directory(directory_path, codebase_path):
     print(f"Total orphans: {total_orphans_count}")
     print()
     
-    return {
+    summary = {
         'files_analyzed': total_files,
         'total_functions': total_functions_count,
         'total_orphans': total_orphans_count
     }
+    if record_stream:
+        write_jsonl_record(record_stream, dict(type='summary', **summary))
+    return summary
+
+
+def analyze_project(root_path, codebase_path=None, index=None, use_ast=False, record_stream=None):
+    """
+    Analyze every Python file under a root directory in one global pass.
+    
+    Each file is read once, for both its definitions and its own references,
+    and every function is checked against a single shared UsageIndex, so a
+    whole addons repository can be analyzed in one run. Results are labeled with the file they come from and
+    can be passed directly to generate_markdown_report / generate_json_report.
+    
+    Args:
+        root_path (str): Root directory whose Python files are analyzed (recursive)
+        codebase_path (str, optional): Root path of the codebase to search for
+                                       function usage. Defaults to root_path
+        index (UsageIndex, optional): Prebuilt index of codebase_path
+        use_ast (bool): Use the ast module when the index is built here
+        record_stream (file, optional): When given, one JSON record per analyzed
+                                        file is written (and flushed) to it as soon
+                                        as the file is done, then a summary record
+    
+    Returns:
+        tuple: (all_functions, orphan_functions) lists of
+               ("relative/path.py:function_name", line_number) tuples
+    
+    Examples:
+        >>> analyze_project('/path/to/custom_addons')
+        ([('my_module/models/sale.py:action_confirm', 12), ...], [...])
+    """
+    root_path = os.path.abspath(root_path)
+    codebase_path = codebase_path or root_path
+    
+    if index is None:
+        index = UsageIndex(codebase_path, use_ast).build()
+    
+    # The analyzed files follow the same ignore rules and globs as the index
+    py_files = list(walk_files(root_path, extensions=('.py',), **index.walk_options))
+    if not py_files:
+        print(f"No Python files found under: {root_path}")
+        return [], []
+    
+    print(f"Found {len(py_files)} Python file(s) under {root_path}.")
+    print()
+    
+    all_functions = []
+    orphan_functions = []
+    for py_file in py_files:
+        started = time.perf_counter()
+        label = os.path.relpath(py_file, root_path)
+        with PROFILER.phase('extract definitions', files=1):
+            content = read_text(py_file)
+            if content is None:
+                print(f"Error reading file {py_file}")
+                functions = []
+            else:
+                functions = extract_functions_from_file(py_file, index.use_ast, content)
+        with PROFILER.phase('usage lookups'):
+            orphans = [(func_name, line_num) for func_name, line_num in functions
+                       if not index.is_used(func_name, py_file, content)]
+        if record_stream:
+            write_jsonl_record(record_stream, build_file_record(
+                py_file, functions, orphans, time.perf_counter() - started))
+        
+        all_functions.extend((f"{label}:{func_name}", line_num) for func_name, line_num in functions)
+        file_orphans = [(f"{label}:{func_name}", line_num) for func_name, line_num in orphans]
+        
+        # Only files with findings are printed, to keep large runs readable
+        if file_orphans:
+            print(f"{label}: {len(file_orphans)} orphan(s)")
+            for func_name, line_num in file_orphans:
+                print(f"  - {func_name.split(':', 1)[1]} (line {line_num})")
+        orphan_functions.extend(file_orphans)
+    
+    print()
+    print("=" * 60)
+    print("OVERALL SUMMARY")
+    print("=" * 60)
+    print(f"Files analyzed: {len(py_files)}")
+    print(f"Total functions: {len(all_functions)}")
+    print(f"Total orphans: {len(orphan_functions)}")
+    print()
+    
+    if record_stream:
+        write_jsonl_record(record_stream, {
+            'type': 'summary',
+            'files_analyzed': len(py_files),
+            'total_functions': len(all_functions),
+            'total_orphans': len(orphan_functions),
+        })
+    return all_functions, orphan_functions
 
 
 def main():
@@ -663,6 +1549,19 @@ def main():
         -p, --path: Path to Python file to check (single file mode)
         -d, --directory: Directory path to check all Python files (directory mode, non-recursive)
         -c, --codebase: Codebase path to search against
+        --rebuild-index: Re-tokenize the whole codebase instead of reusing the cache
+        --no-cache: Build the usage index in memory only
+        -j, --jobs: Number of processes used to scan the codebase (0 = all cores)
+        --ast: Extract definitions and references with the ast module
+        -r, --recursive, --project: Analyze the -d directory recursively (project mode)
+        --include, --exclude: Globs filtering the scanned files (relative paths)
+        --no-ignore: Do not prune vendored directories or honor ignore files
+        -o, --output-dir: Where project mode writes its consolidated reports
+        --profile: Print a per-phase timing and I/O summary table
+        --profile-output: Write a cProfile dump (implies --profile)
+        --trace-output: Write a Chrome trace file (implies --profile)
+        --format: text (default) or jsonl - one JSON record per analyzed file,
+                  streamed to stdout while human output goes to stderr
     
     Modes:
         Single File Mode (-p):
@@ -675,6 +1574,12 @@ def main():
             - Prints results to terminal only (no report generation)
             - Requires codebase path via -c or interactive prompt
             - Shows per-file results and overall summary
+        
+        Project Mode (-d with -r/--project):
+            - Analyzes every Python file under the directory (recursive)
+            - Uses the directory itself as codebase unless -c is given
+            - Checks all functions against one shared index in a single pass
+            - Writes one consolidated Markdown and JSON report
     
     Interactive Prompts:
         - Target Python file path: The file to analyze (if -p not provided in single file mode)
@@ -698,6 +1603,7 @@ def main():
         >>> main()  # Interactive mode
         >>> python script.py -p utils.py -c /project/src  # Single file mode
         >>> python script.py -d /project/modules -c /project  # Directory mode
+        >>> python script.py -d /project/custom_addons --project  # Project mode
     
     Notes:
         - -p and -d are mutually exclusive
@@ -711,8 +1617,67 @@ def main():
     parser.add_argument('-p', '--path', type=str, help='Path to Python file to check')
     parser.add_argument('-d', '--directory', type=str, help='Directory path to check all Python files (non-recursive)')
     parser.add_argument('-c', '--codebase', type=str, help='Codebase path to search against')
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help='Ignore the cached usage index and re-tokenize the whole codebase')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the persistent usage index cache')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of processes used to scan the codebase (0 = one per CPU core, default: 1)')
+    parser.add_argument('--ast', action='store_true',
+                        help='Parse Python files with the ast module: qualified names and exact references')
+    parser.add_argument('-r', '--recursive', '--project', action='store_true',
+                        help='With -d: analyze every Python file under the directory and write one consolidated report')
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help='Only scan files whose path relative to the root matches GLOB (repeatable)')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help='Skip files and directories whose relative path matches GLOB (repeatable)')
+    parser.add_argument('--no-ignore', action='store_true',
+                        help='Also scan .git, node_modules, static/lib, i18n and .gitignore/.odooignore entries')
+    parser.add_argument('-o', '--output-dir', type=str,
+                        help='Directory for the consolidated reports of project mode (default: the analyzed directory)')
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text',
+                        help='Directory/project mode output: human text, or one JSON record per file on stdout')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print wall time, files, bytes read and cache hits per phase')
+    parser.add_argument('--profile-output', type=str, metavar='FILE',
+                        help='Write a cProfile dump of the run to FILE (implies --profile)')
+    parser.add_argument('--trace-output', type=str, metavar='FILE',
+                        help='Write the phases as a Chrome trace JSON file (implies --profile)')
     args = parser.parse_args()
     
+    PROFILER.enabled = bool(args.profile or args.profile_output or args.trace_output)
+    profiler = cProfile.Profile() if args.profile_output else None
+    
+    # In JSON lines mode stdout carries only the records; human output goes to stderr
+    record_stream = sys.stdout if args.format == 'jsonl' else None
+    with contextlib.redirect_stdout(sys.stderr) if record_stream else contextlib.nullcontext():
+        if profiler:
+            profiler.enable()
+        try:
+            run_analysis(args, record_stream)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile_output)
+                print(f"cProfile dump saved: {args.profile_output}")
+            if args.trace_output:
+                PROFILER.write_chrome_trace(args.trace_output)
+                print(f"Chrome trace saved: {args.trace_output}")
+            if PROFILER.enabled:
+                PROFILER.print_summary()
+
+
+def run_analysis(args, record_stream=None):
+    """
+    Run the analysis selected by the parsed command-line arguments.
+    
+    Args:
+        args (argparse.Namespace): Arguments parsed by main()
+        record_stream (file, optional): Stream receiving JSON lines records
+                                        (--format jsonl, directory/project mode)
+    """
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
     print("=" * 60)
     print("Orphan Function Finder")
     print("=" * 60)
@@ -733,9 +1698,11 @@ def main():
             print(f"Error: Directory '{directory_path}' does not exist.")
             return
         
-        # Get codebase path (required for directory mode)
+        # Get codebase path (required for directory mode, defaults to the root in project mode)
         if args.codebase:
             codebase_path = args.codebase
+        elif args.recursive:
+            codebase_path = directory_path
         else:
             codebase_path = input("Enter the codebase path to search against: ").strip()
         
@@ -745,14 +1712,54 @@ def main():
             return
         
         print()
-        # Analyze directory
-        analyze_directory(directory_path, codebase_path)
+        index = load_usage_index(codebase_path, use_cache=not args.no_cache,
+                                 rebuild=args.rebuild_index, jobs=jobs, use_ast=args.ast,
+                                 include=args.include, exclude=args.exclude,
+                                 use_ignore_rules=not args.no_ignore)
+        
+        if args.recursive:
+            # Project mode: one global pass and a single consolidated report
+            directory_path = os.path.abspath(directory_path)
+            all_functions, orphan_functions = analyze_project(directory_path, codebase_path, index,
+                                                              record_stream=record_stream)
+            if record_stream:
+                # Records were streamed already; no consolidated report is kept in memory
+                print("=" * 60)
+                print("Analysis complete.")
+                print("=" * 60)
+                return
+            output_dir = args.output_dir or directory_path
+            os.makedirs(output_dir, exist_ok=True)
+            
+            with PROFILER.phase('reports'):
+                md_report_path = generate_markdown_report(directory_path, codebase_path, all_functions,
+                                                          orphan_functions, output_dir)
+            if md_report_path:
+                print(f"✓ Markdown report saved: {md_report_path}")
+            else:
+                print("✗ Failed to generate Markdown report")
+            
+            with PROFILER.phase('reports'):
+                json_report_path = generate_json_report(directory_path, codebase_path, all_functions,
+                                                        orphan_functions, output_dir)
+            if json_report_path:
+                print(f"✓ JSON report saved: {json_report_path}")
+            else:
+                print("✗ Failed to generate JSON report")
+            print()
+        else:
+            # Analyze directory
+            analyze_directory(directory_path, codebase_path, index, record_stream=record_stream)
         
         print("=" * 60)
         print("Analysis complete.")
         print("=" * 60)
         return
     
+    if record_stream:
+        print("Error: --format jsonl is only available with -d/--directory.")
+        return
+    
     # Step 3: Handle single file mode (existing logic)
     # Get user inputs (from CLI args or interactive prompts)
     if args.path:
@@ -779,7 +1786,8 @@ def main():
     print()
     
     # Step 3: Extract all function definitions from the target file
-    functions = extract_functions_from_file(target_file)
+    with PROFILER.phase('extract definitions', files=1):
+        functions = extract_functions_from_file(target_file, use_ast=args.ast)
     
     if not functions:
         print("No functions found in the target file.")
@@ -792,12 +1800,19 @@ def main():
     orphan_functions = []  # List of (function_name, line_number) tuples
     orphan_lines = set()   # Set of line numbers for efficient lookup
     
-    for func_name, line_num in functions:
-        is_used = search_function_usage(func_name, codebase_path, target_file)
-        if not is_used:
-            # Function is not called anywhere - it's an orphan
-            orphan_functions.append((func_name, line_num))
-            orphan_lines.add(line_num)
+    # Index the codebase once; every function lookup below is a dictionary lookup
+    index = load_usage_index(codebase_path, use_cache=not args.no_cache,
+                             rebuild=args.rebuild_index, jobs=jobs, use_ast=args.ast,
+                             include=args.include, exclude=args.exclude,
+                             use_ignore_rules=not args.no_ignore)
+    
+    with PROFILER.phase('usage lookups'):
+        for func_name, line_num in functions:
+            is_used = search_function_usage(func_name, codebase_path, target_file, index)
+            if not is_used:
+                # Function is not called anywhere - it's an orphan
+                orphan_functions.append((func_name, line_num))
+                orphan_lines.add(line_num)
     
     # Step 5: Display results
     if orphan_functions:
@@ -838,14 +1853,16 @@ def main():
         print()
         
         # Generate Markdown report
-        md_report_path = generate_markdown_report(target_file, codebase_path, functions, orphan_functions, output_dir)
+        with PROFILER.phase('reports'):
+            md_report_path = generate_markdown_report(target_file, codebase_path, functions, orphan_functions, output_dir)
         if md_report_path:
             print(f"✓ Markdown report saved: {md_report_path}")
         else:
             print("✗ Failed to generate Markdown report")
         
         # Generate JSON report
-        json_report_path = generate_json_report(target_file, codebase_path, functions, orphan_functions, output_dir)
+        with PROFILER.phase('reports'):
+            json_report_path = generate_json_report(target_file, codebase_path, functions, orphan_functions, output_dir)
         if json_report_path:
             print(f"✓ JSON report saved: {json_report_path}")
         else:
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared file reading and traversal helpers for the Odoo analysis scripts.
+
+Large files (generated XML data files, vendored bundles) are memory-mapped
+instead of being copied into Python strings, so they can be searched at the
+bytes level before anything is decoded. Decoding tries several encodings so
+that no file gets skipped because it is not valid UTF-8.
+
+Directory traversal prunes whole directories before descending into them:
+VCS metadata, node_modules, __pycache__, vendored static/lib bundles and i18n
+catalogs, anything matched by .gitignore or the project-level .odooignore
+file, and user supplied --exclude globs.
+
+Usage:
+    from odoo_file_utils import read_text, search_bytes, walk_files
+
+    for path in walk_files('/path/to/addons', extensions=('.xml',)):
+        if search_bytes(path, re.compile(rb'<button')):
+            content = read_text(path)
+"""
+
+import os
+import mmap
+import fnmatch
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Files at least this big are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 1024 * 1024
+# Tried in order (utf-8-sig also strips a BOM); latin-1 decodes any byte sequence
+FALLBACK_ENCODINGS = ('utf-8-sig', 'cp1252', 'latin-1')
+# Directory names that never contain code worth analyzing
+DEFAULT_EXCLUDED_DIRS = ('.git', '.hg', '.svn', '.idea', '.vscode', '.tox', '.venv', 'venv',
+                         'node_modules', '__pycache__', 'i18n', 'i18n_extra')
+# Relative path globs of vendored content inside modules
+DEFAULT_EXCLUDED_PATHS = ('static/lib', '*/static/lib')
+# Ignore files honored during traversal, in every directory of the tree
+IGNORE_FILE_NAMES = ('.gitignore', '.odooignore')
+
+
+@contextlib.contextmanager
+def open_bytes(file_path):
+    """Yield the raw content of a file, memory-mapped when it is large.
+
+    The yielded object supports the buffer protocol (bytes or mmap), so it can
+    be searched with bytes regexes without decoding it first.
+
+    Raises:
+        OSError: If the file cannot be opened
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def decode_bytes(data):
+    """Decode raw file content, falling back through FALLBACK_ENCODINGS."""
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            return str(data, encoding)
+        except UnicodeDecodeError:
+            continue
+    # Unreachable while latin-1 is in FALLBACK_ENCODINGS
+    return str(data, FALLBACK_ENCODINGS[-1], errors='replace')
+
+
+def search_bytes(file_path, pattern):
+    """Search a file for a compiled bytes regex without decoding it.
+
+    Args:
+        file_path: Path of the file to search
+        pattern: Compiled regex with a bytes pattern
+
+    Returns:
+        bool: True if the pattern occurs in the file, False otherwise
+              (or if the file cannot be read)
+    """
+    try:
+        with open_bytes(file_path) as data:
+            return pattern.search(data) is not None
+    except (OSError, ValueError):
+        return False
+
+
+def read_text(file_path):
+    """Read a text file whatever its encoding.
+
+    Returns:
+        str: Decoded file content
+        None: If the file cannot be read (missing, permissions, ...)
+    """
+    try:
+        with open_bytes(file_path) as data:
+            return decode_bytes(data)
+    except (OSError, ValueError):
+        return None
+
+
+class IgnoreRules:
+    """Accumulated .gitignore-style rules of a directory and its parents.
+
+    Supports the commonly used subset of the gitignore syntax: comments,
+    negation (!pattern), directory-only patterns (trailing /), patterns
+    anchored to the ignore file's directory (containing a /) and shell
+    wildcards. The last matching rule wins.
+    """
+
+    def __init__(self, rules=()):
+        # (base_dir, pattern, negated, dir_only, anchored)
+        self.rules = tuple(rules)
+
+    def extended(self, directory):
+        """Return the rules that apply inside `directory`, adding its ignore files."""
+        new_rules = []
+        for ignore_name in IGNORE_FILE_NAMES:
+            content = read_text(os.path.join(directory, ignore_name))
+            if not content:
+                continue
+            for line in content.splitlines():
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                negated = line.startswith('!')
+                if negated:
+                    line = line[1:]
+                dir_only = line.endswith('/')
+                line = line.rstrip('/')
+                anchored = '/' in line
+                line = line.lstrip('/')
+                if line:
+                    new_rules.append((directory, line, negated, dir_only, anchored))
+        return IgnoreRules(self.rules + tuple(new_rules)) if new_rules else self
+
+    def is_ignored(self, path, is_dir):
+        """Tell whether a path is ignored by the accumulated rules."""
+        ignored = False
+        for base_dir, pattern, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if anchored:
+                target = os.path.relpath(path, base_dir).replace(os.sep, '/')
+            else:
+                target = os.path.basename(path)
+            if fnmatch.fnmatchcase(target, pattern):
+                ignored = not negated
+        return ignored
+
+
+def _matches_any(relative_path, globs):
+    """Tell whether a '/'-separated relative path matches one of the globs."""
+    return any(fnmatch.fnmatchcase(relative_path, pattern) for pattern in globs)
+
+
+def walk_files(root, extensions=None, file_names=None, include=(), exclude=(), use_ignore_rules=True,
+               stop_at_files=None, max_depth=None, skip_hidden=False, jobs=1):
+    """Yield the files under `root`, pruning ignored directories before descending.
+
+    Entries are visited in sorted order, so the output is deterministic (and
+    the same whatever the number of jobs).
+
+    Args:
+        root: Directory to walk
+        extensions: Optional tuple of file suffixes to keep (e.g. ('.py', '.xml'))
+        file_names: Optional collection of exact file names to keep
+        include: Globs on the path relative to root; when given, only matching
+                 files are yielded
+        exclude: Globs on the path relative to root; matching files are
+                 skipped and matching directories are not descended into
+        use_ignore_rules: Apply DEFAULT_EXCLUDED_DIRS, DEFAULT_EXCLUDED_PATHS
+                          and the .gitignore / .odooignore files
+        stop_at_files: Optional collection of file names; a directory holding
+                       one of them is scanned but its subdirectories are not
+                       (e.g. ('__manifest__.py',) stops at module roots)
+        max_depth: Deepest directory level scanned (root is 0), None for no limit
+        skip_hidden: Do not descend into directories whose name starts with '.'
+        jobs: Number of threads scanning the top-level subdirectories in parallel
+
+    Yields:
+        str: Path of each matching file
+    """
+    root = os.path.abspath(root)
+    options = {
+        'root': root,
+        'extensions': tuple(extensions) if extensions else None,
+        'file_names': file_names,
+        'include': include,
+        'exclude': exclude,
+        'use_ignore_rules': use_ignore_rules,
+        'stop_at_files': stop_at_files,
+        'max_depth': max_depth,
+        'skip_hidden': skip_hidden,
+    }
+    root_rules = IgnoreRules().extended(root) if use_ignore_rules else IgnoreRules()
+    if jobs <= 1:
+        yield from _walk([(root, root_rules, 0)], options)
+        return
+
+    # Scan the root itself, then each top-level subdirectory in its own thread
+    files, subdirectories = _scan_directory(root, root_rules, 0, options)
+    yield from files
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for subdirectory_files in executor.map(lambda start: list(_walk([start], options)), subdirectories):
+            yield from subdirectory_files
+
+
+def _walk(stack, options):
+    """Depth-first walk from the (directory, rules, depth) entries of `stack`."""
+    stack = list(reversed(stack))
+    while stack:
+        directory, rules, depth = stack.pop()
+        files, subdirectories = _scan_directory(directory, rules, depth, options)
+        yield from files
+        # Reversed so that the stack pops subdirectories in sorted order
+        stack.extend(reversed(subdirectories))
+
+
+def _scan_directory(directory, rules, depth, options):
+    """Scan one directory.
+
+    Returns:
+        Tuple of (files, subdirectories): the matching files of the directory
+        and the (directory, rules, depth) entries of the subdirectories to walk
+    """
+    root = options['root']
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda entry: entry.name)
+    except OSError:
+        return [], []
+
+    files = []
+    subdirectories = []
+    stop = False
+    for entry in entries:
+        relative_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if is_dir and options['skip_hidden'] and entry.name.startswith('.'):
+            continue
+        if options['use_ignore_rules']:
+            if is_dir and (entry.name in DEFAULT_EXCLUDED_DIRS
+                           or _matches_any(relative_path, DEFAULT_EXCLUDED_PATHS)):
+                continue
+            if rules.is_ignored(entry.path, is_dir):
+                continue
+        if options['exclude'] and _matches_any(relative_path, options['exclude']):
+            continue
+
+        if is_dir:
+            subdirectories.append(entry.path)
+            continue
+        if options['stop_at_files'] and entry.name in options['stop_at_files']:
+            stop = True
+        if options['extensions'] and not entry.name.endswith(options['extensions']):
+            continue
+        if options['file_names'] and entry.name not in options['file_names']:
+            continue
+        if options['include'] and not _matches_any(relative_path, options['include']):
+            continue
+        files.append(entry.path)
+
+    if stop or (options['max_depth'] is not None and depth >= options['max_depth']):
+        return files, []
+    return files, [
+        (subdirectory, rules.extended(subdirectory) if options['use_ignore_rules'] else rules, depth + 1)
+        for subdirectory in subdirectories
+    ]
@@ -5,87 +5,368 @@ This script parses Odoo module manifests and generates a dependency graph.
 
 Usage:
     python module_dependency_graph.py -p <addons_path> -m <module_name|all>
+    python module_dependency_graph.py -c <odoo.conf> -m <module_name|all>
     
     For full graph of all modules:
         python odoo_module_dependency_graph.py -p /path/to/addons -m all
     
-    For specific module subgraphs:
+    For specific module subgraphs (several modules are drawn in one run,
+    graphs whose DOT content did not change are not rendered again):
         python odoo_module_dependency_graph.py -p /path/to/addons -m module_name
+        python odoo_module_dependency_graph.py -p /path/to/addons -m sale,crm,stock
+
+    For a real deployment (several addons paths, first match wins):
+        python odoo_module_dependency_graph.py -p /odoo/addons,/custom/addons -m all
+        python odoo_module_dependency_graph.py -c /etc/odoo/odoo.conf -m all
+
+    For huge trees, one node per repository or manifest category:
+        python odoo_module_dependency_graph.py -p /path/to/addons -m all --collapse repository
+
+    For the install order and the waves of modules installable in parallel:
+        python odoo_module_dependency_graph.py install-order -p /path/to/addons [-m module_name]
+
+    To export the graph once, then query it without rescanning the addons:
+        python odoo_module_dependency_graph.py export -p /path/to/addons -o graph.json
+        python odoo_module_dependency_graph.py query -g graph.json dependents sale
+
+    For a filtered adjacency list (text, CSV or JSON lines):
+        python odoo_module_dependency_graph.py adjacency -p /path/to/addons --root sale --depth 2
+
+    For per-module metrics (blast radius, depth, betweenness, cycles):
+        python odoo_module_dependency_graph.py metrics -p /path/to/addons -o metrics.csv
+
+    To check for dependency cycles (exit status 1 if any, for CI):
+        python odoo_module_dependency_graph.py cycles -p /path/to/addons
+
+    To check the declared dependencies against the modules' Python code:
+        python odoo_module_dependency_graph.py check-deps -p /path/to/addons
+
+    For the modules to test after a change (changed modules and their dependents):
+        python odoo_module_dependency_graph.py impact -p /path/to/addons --git origin/17.0...HEAD
 
 Required arguments:
-    -p, --path: Path to the Odoo addons directory
+    -p, --path and/or -c, --config: Odoo addons directories, or an Odoo
+        configuration file providing addons_path
     -m, --module-name: Module name or 'all' to generate full graph
 """
 
 import os
 import sys
 import ast
+import io
+import json
+import pickle
+import hashlib
+import csv
 import argparse
+import configparser
+import contextlib
+import glob
+import shlex
+import subprocess
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 import networkx as nx
+import graphviz
 from graphviz import Digraph
 
+from odoo_file_utils import read_text, walk_files
 
-def find_manifest_files(directory):
-    """Find all manifest files in the given directory and its subdirectories."""
-    manifest_files = []
-    for root, _, files in os.walk(directory):
-        if '__manifest__.py' in files:
-            manifest_files.append(os.path.join(root, '__manifest__.py'))
-    return manifest_files
+# Bump whenever the cached manifest data or graph layout changes
+GRAPH_CACHE_VERSION = 4
+# Bump whenever the cached Python file scan results change
+SCAN_CACHE_VERSION = 1
+# Manifest, graph and scan caches live outside the analyzed addons directory
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'odoo_module_dependency_graph')
+# Graphs with more nodes are drawn in large-graph mode (see visualize_with_graphviz)
+LARGE_GRAPH_THRESHOLD = 300
+# Layout engine used instead of dot for large graphs
+LARGE_GRAPH_ENGINE = 'sfdp'
+# Sampled source modules estimating betweenness on larger graphs (exact below)
+BETWEENNESS_SAMPLES = 500
+# Graph export formats, by file extension
+GRAPH_FILE_FORMATS = {'.json': 'json', '.graphml': 'graphml', '.edgelist': 'edgelist', '.txt': 'edgelist'}
+# Identifies the JSON graph files written by export_graph()
+GRAPH_JSON_FORMAT = 'odoo-module-dependency-graph'
+# Node attributes stored as JSON strings in GraphML files
+STRUCTURED_ATTRIBUTES = ('auto_install_triggers', 'external_dependencies')
 
 
-def parse_manifest(manifest_path):
-    """Parse a manifest file and extract module name and dependencies."""
+def find_manifest_files(directory, exclude=(), max_depth=None, jobs=1):
+    """Find all manifest files in the given directory and its subdirectories.
+    
+    A manifest can only sit at a module root, so the scan stops descending as
+    soon as a directory holds a '__manifest__.py': the static/, i18n/, tests/
+    and data/ trees of modules are never walked. Hidden directories, those
+    ignored by the shared traversal layer (node_modules, static/lib,
+    .gitignore / .odooignore entries) and those matching the `exclude` globs
+    are pruned as well.
+    
+    Args:
+        directory: Addons directory to scan
+        exclude: Globs of directories to skip, relative to `directory`
+        max_depth: Deepest directory level scanned (`directory` is 0), None for no limit
+        jobs: Number of threads scanning the top-level subdirectories in parallel
+        
+    Returns:
+        Sorted list of manifest file paths
+    """
+    return list(walk_files(directory, file_names=('__manifest__.py',), exclude=exclude,
+                           stop_at_files=('__manifest__.py',), max_depth=max_depth,
+                           skip_hidden=True, jobs=jobs))
+
+
+def read_addons_path_from_config(config_path):
+    """Return the addons_path entries of an Odoo configuration file, in order."""
+    config = configparser.ConfigParser(interpolation=None)
+    if not config.read(config_path, encoding='utf-8'):
+        raise OSError(f"cannot read configuration file {config_path}")
+    addons_path = config.get('options', 'addons_path', fallback='')
+    return [path.strip() for path in addons_path.split(',') if path.strip()]
+
+
+def find_modules_in_paths(addons_paths, exclude=(), max_depth=None, jobs=1):
+    """Find the manifests of several addons paths, applying Odoo's shadowing rules.
+    
+    All roots are walked concurrently. As in Odoo, when a module name exists in
+    several addons paths, the first path of the list wins and the other copies
+    are shadowed. A root never descends into another listed root nested in it:
+    the nested root's modules keep the priority of its own place in the list.
+    
+    Args:
+        addons_paths: Ordered list of addons directories
+        exclude: Globs of directories to skip (see find_manifest_files)
+        max_depth: Deepest directory level scanned in each addons path; Odoo
+            itself only loads the immediate children of a path (1)
+        jobs: Number of threads scanning the subdirectories of each addons path
+        
+    Returns:
+        Tuple of (manifest_files, duplicates): the manifests of the modules in
+        use, and a dict mapping each duplicated module name to the list of its
+        manifests, the one in use first
+    """
+    addons_paths = [os.path.abspath(path) for path in addons_paths]
+
+    def scan(path):
+        nested_roots = tuple(glob.escape(os.path.relpath(other, path).replace(os.sep, '/'))
+                             for other in addons_paths
+                             if other != path and os.path.commonpath([path, other]) == path)
+        return find_manifest_files(path, tuple(exclude) + nested_roots, max_depth, jobs)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(32, len(addons_paths)))) as executor:
+        results = list(executor.map(scan, addons_paths))
+    
+    modules = {}  # module name -> manifest in use
+    duplicates = {}
+    seen_files = set()
+    for manifest_files in results:
+        for manifest_file in manifest_files:
+            real_path = os.path.realpath(manifest_file)
+            if real_path in seen_files:
+                continue
+            seen_files.add(real_path)
+            module_name = os.path.basename(os.path.dirname(manifest_file))
+            if module_name in modules:
+                duplicates.setdefault(module_name, [modules[module_name]]).append(manifest_file)
+            else:
+                modules[module_name] = manifest_file
+    return list(modules.values()), duplicates
+
+
+def read_manifest(manifest_path):
+    """Parse a manifest file.
+    
+    Returns:
+        Tuple of (module_name, manifest_dict), or (None, {}) if the manifest
+        cannot be read or parsed
+    """
     try:
-        with open(manifest_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            manifest_dict = ast.literal_eval(content)
-            
-            # Extract module name from the path
-            module_name = os.path.basename(os.path.dirname(manifest_path))
-            
-            # Extract dependencies
-            dependencies = manifest_dict.get('depends', [])
-            
-            return module_name, dependencies
+        content = read_text(manifest_path)
+        if content is None:
+            raise OSError("file cannot be read")
+        manifest_dict = ast.literal_eval(content)
+        
+        # Extract module name from the path
+        module_name = os.path.basename(os.path.dirname(manifest_path))
+        
+        return module_name, manifest_dict
     except (SyntaxError, ValueError) as e:
         print(f"Error parsing manifest file {manifest_path}: {e}")
-        return None, []
+        return None, {}
     except Exception as e:
         print(f"Unexpected error while parsing {manifest_path}: {e}")
-        return None, []
+        return None, {}
+
+
+def parse_manifest(manifest_path):
+    """Parse a manifest file and extract module name and dependencies."""
+    module_name, manifest_dict = read_manifest(manifest_path)
+    return module_name, manifest_dict.get('depends', [])
+
+
+def module_attributes(manifest_path, manifest_dict):
+    """Return the node attributes of a module: its location and manifest metadata.
+    
+    auto_install is normalized like Odoo does: True means the module is
+    installed as soon as all its dependencies are, a list names the subset of
+    dependencies that triggers it. 'auto_install_triggers' holds the
+    resulting module list (empty when the module is not auto-installed).
+    """
+    module_path = os.path.dirname(os.path.abspath(manifest_path))
+    auto_install = manifest_dict.get('auto_install', False)
+    if isinstance(auto_install, (list, tuple, set)):
+        triggers = sorted(auto_install)
+    else:
+        triggers = sorted(manifest_dict.get('depends', [])) if auto_install else []
+    external_dependencies = manifest_dict.get('external_dependencies') or {}
+    if not isinstance(external_dependencies, dict):
+        print(f"Warning: ignoring external_dependencies of {manifest_path}: expected a dict, "
+              f"got {type(external_dependencies).__name__}")
+        external_dependencies = {}
+    return {
+        'path': module_path,
+        'repository': os.path.dirname(module_path),
+        'name': str(manifest_dict.get('name', '')),
+        'category': manifest_dict.get('category') or 'Uncategorized',
+        'version': str(manifest_dict.get('version', '')),
+        'license': str(manifest_dict.get('license', '')),
+        'installable': bool(manifest_dict.get('installable', True)),
+        'application': bool(manifest_dict.get('application', False)),
+        'auto_install': bool(auto_install),
+        'auto_install_triggers': triggers,
+        'external_dependencies': {
+            kind: sorted([packages] if isinstance(packages, str) else packages)
+            for kind, packages in external_dependencies.items() if packages
+        },
+    }
+
+
+def parse_module(manifest_path):
+    """Parse a manifest into the (module_name, dependencies, attributes) used to build the graph."""
+    module_name, manifest_dict = read_manifest(manifest_path)
+    return module_name, manifest_dict.get('depends', []), module_attributes(manifest_path, manifest_dict)
 
 
 def create_dependency_graph(manifest_files):
     """Create a directed graph of module dependencies."""
+    return graph_from_modules(parse_module(manifest_file) for manifest_file in manifest_files)
+
+
+def graph_from_modules(modules):
+    """Create the dependency graph from (module_name, dependencies, attributes) triples.
+    
+    The attributes dict is stored on the module's node. Dependencies without
+    a manifest of their own become nodes without attributes.
+    """
     G = nx.DiGraph()
     
-    # Parse each manifest file and add nodes and edges to the graph
-    for manifest_file in manifest_files:
-        module_name, dependencies = parse_manifest(manifest_file)
+    # Add nodes and edges to the graph, skipping manifests that failed to parse
+    for module_name, dependencies, attributes in modules:
         if module_name:
-            G.add_node(module_name)
+            G.add_node(module_name, **attributes)
             for dependency in dependencies:
                 G.add_edge(module_name, dependency)
     
     return G
 
+
+def default_graph_cache_path(addons_paths):
+    """Return the default cache file for an ordered list of addons paths."""
+    key = '\n'.join(os.path.abspath(path) for path in addons_paths)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(DEFAULT_CACHE_DIR, f"graph_{digest}.pickle")
+
+
+def load_graph_cache(cache_path):
+    """Load a manifest/graph cache, returning an empty one if missing, unreadable or outdated."""
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+        if isinstance(cache, dict) and cache.get('version') == GRAPH_CACHE_VERSION:
+            return cache
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        print(f"Warning: ignoring unreadable graph cache {cache_path}: {e}")
+    return {'version': GRAPH_CACHE_VERSION, 'manifests': {}}
+
+
+def save_graph_cache(cache_path, cache):
+    """Write a manifest/graph cache atomically."""
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        temporary_path = f"{cache_path}.tmp"
+        with open(temporary_path, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write graph cache {cache_path}: {e}")
+
+
+def build_dependency_graph(manifest_files, cache_path=None, rebuild=False):
+    """Create the dependency graph, re-parsing only the manifests that changed.
+    
+    Parsed manifests are cached by path and (mtime, size). When no manifest was
+    added, removed or modified since the previous run, the graph snapshot saved
+    in the cache is returned as is.
+    
+    Args:
+        manifest_files: List of manifest file paths
+        cache_path: Cache file to reuse and refresh (None disables caching)
+        rebuild: Ignore the cache content and parse every manifest
+        
+    Returns:
+        NetworkX DiGraph, identical to create_dependency_graph(manifest_files)
+    """
+    if not cache_path:
+        return create_dependency_graph(manifest_files)
+    
+    cache = load_graph_cache(cache_path) if not rebuild else {'version': GRAPH_CACHE_VERSION, 'manifests': {}}
+    cached_manifests = cache['manifests']
+    manifests = {}
+    parsed_count = 0
+    
+    for manifest_file in manifest_files:
+        try:
+            stat = os.stat(manifest_file)
+        except OSError as e:
+            print(f"Unexpected error while parsing {manifest_file}: {e}")
+            continue
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = cached_manifests.get(manifest_file)
+        if not entry or entry['signature'] != signature:
+            module_name, dependencies, attributes = parse_module(manifest_file)
+            entry = {'signature': signature, 'module': module_name, 'depends': list(dependencies),
+                     'attributes': attributes}
+            parsed_count += 1
+        manifests[manifest_file] = entry
+    
+    snapshot_key = hashlib.sha1(repr([
+        (manifest_file, entry['signature']) for manifest_file, entry in manifests.items()
+    ]).encode('utf-8')).hexdigest()
+    
+    print(f"Parsed {parsed_count} manifest(s), {len(manifests) - parsed_count} loaded from cache.")
+    if cache.get('snapshot_key') == snapshot_key and cache.get('graph') is not None:
+        return cache['graph']
+    
+    G = graph_from_modules((entry['module'], entry['depends'], entry['attributes']) for entry in manifests.values())
+    save_graph_cache(cache_path, {
+        'version': GRAPH_CACHE_VERSION,
+        'manifests': manifests,
+        'snapshot_key': snapshot_key,
+        'graph': G,
+    })
+    return G
+
 def get_dependents_subgraph(G, root_module):
     """Return a subgraph containing the root_module and all modules that (directly or indirectly) depend on it."""
     if root_module not in G:
         print(f"Module '{root_module}' not found in the dependency graph.")
         return G.subgraph([]).copy()
-    # Find all nodes that have a path to root_module (i.e., all dependents)
-    dependents = set()
-    for node in G.nodes():
-        if node == root_module:
-            dependents.add(node)
-        else:
-            try:
-                if nx.has_path(G, node, root_module):
-                    dependents.add(node)
-            except nx.NetworkXError:
-                continue
+    # Dependents are the modules with a path to root_module: one reverse traversal, O(V + E)
+    dependents = nx.ancestors(G, root_module)
+    dependents.add(root_module)
     # The subgraph should include the root and all its dependents
     return G.subgraph(dependents).copy()
 
@@ -95,58 +376,479 @@ def get_dependencies_subgraph(G, root_module):
     if root_module not in G:
         print(f"Module '{root_module}' not found in the dependency graph.")
         return G.subgraph([]).copy()
-    # Find all nodes that root_module has a path to (i.e., all dependencies)
-    dependencies = set()
+    # Dependencies are the modules reachable from root_module: one traversal, O(V + E)
+    dependencies = nx.descendants(G, root_module)
     dependencies.add(root_module)  # Include the root module itself
     
-    try:
-        # Get all nodes reachable from root_module (all dependencies)
-        for node in G.nodes():
-            if node != root_module:
-                try:
-                    if nx.has_path(G, root_module, node):
-                        dependencies.add(node)
-                except nx.NetworkXError:
-                    continue
-    except nx.NetworkXError:
-        pass
-    
     # The subgraph should include the root and all its dependencies
     return G.subgraph(dependencies).copy()
 
 
-def visualize_with_graphviz(G, output_file=None, output_dir=None, format_type='svg'):
+def _shortest_cycle(G, members):
+    """Find a shortest cycle among the modules of one strongly connected component."""
+    best = None
+    for start in sorted(members):
+        # Breadth-first search back to `start`, no deeper than the best cycle so far
+        parents = {start: None}
+        frontier = [start]
+        depth = 0
+        found = None
+        while frontier and found is None and (best is None or depth + 1 < len(best)):
+            depth += 1
+            next_frontier = []
+            for module in frontier:
+                for dependency in sorted(G.successors(module)):
+                    if dependency == start:
+                        found = module
+                        break
+                    if dependency in members and dependency not in parents:
+                        parents[dependency] = module
+                        next_frontier.append(dependency)
+                if found is not None:
+                    break
+            frontier = next_frontier
+        if found is not None:
+            cycle = []
+            while found is not None:
+                cycle.append(found)
+                found = parents[found]
+            best = cycle[::-1]
+    return best
+
+
+def find_dependency_cycles(G):
+    """Yield one shortest dependency cycle per strongly connected component.
+    
+    Components are found in linear time; unlike enumerating every elementary
+    cycle (whose number can grow exponentially), only one witness cycle is
+    searched for per component, by breadth-first searches inside it. Cycles
+    are yielded as soon as they are found, ordered by their first module.
+    
+    Args:
+        G: NetworkX dependency graph
+        
+    Yields:
+        Tuple of (cycle, component): the modules of the cycle, each depending
+        on the next and the last on the first, and the sorted modules of its
+        strongly connected component
+    """
+    components = [
+        sorted(component) for component in nx.strongly_connected_components(G)
+        if len(component) > 1 or G.has_edge(next(iter(component)), next(iter(component)))
+    ]
+    for component in sorted(components):
+        yield _shortest_cycle(G, set(component)), component
+
+
+def _reachability_bitsets(graph):
+    """Condense a graph and compute what each of its components reaches.
+    
+    Returns:
+        Tuple of (condensed, reachable): the condensation DAG of `graph` and a
+        dict mapping each component to the integer bitset of the components
+        it reaches, itself included
+    """
+    condensed = nx.condensation(graph)
+    
+    # Successors are processed before their predecessors
+    reachable = {}
+    for component in reversed(list(nx.topological_sort(condensed))):
+        bits = 1 << component
+        for successor in condensed.successors(component):
+            bits |= reachable[successor]
+        reachable[component] = bits
+    return condensed, reachable
+
+
+def compute_closures(G, root_modules, direction='dependencies'):
+    """Compute the transitive closure of many root modules in one sweep.
+    
+    The graph is condensed into its DAG of strongly connected components, which
+    is then swept once in reverse topological order. Each component's reachable
+    set is kept as an integer bitset, so the closures of all requested modules
+    cost one pass over the graph instead of one traversal per module.
+    
+    Args:
+        G: NetworkX dependency graph (edges go from a module to its dependencies)
+        root_modules: Iterable of module names; names missing from G are skipped
+        direction: 'dependencies' (modules each root needs) or
+                   'dependents' (modules that need each root)
+        
+    Returns:
+        Dict mapping each root module found in G to the set of modules in its
+        closure, the root itself included
+    """
+    if direction not in ('dependencies', 'dependents'):
+        raise ValueError(f"Unknown closure direction: {direction}")
+    roots = [module for module in dict.fromkeys(root_modules) if module in G]
+    if not roots:
+        return {}
+    
+    graph = G if direction == 'dependencies' else G.reverse(copy=False)
+    condensed, reachable = _reachability_bitsets(graph)
+    mapping = condensed.graph['mapping']
+    members = [sorted(condensed.nodes[component]['members']) for component in range(len(condensed))]
+    
+    closures = {}
+    for module in roots:
+        bits = reachable[mapping[module]]
+        closure = set()
+        while bits:
+            lowest = bits & -bits
+            closure.update(members[lowest.bit_length() - 1])
+            bits ^= lowest
+        closures[module] = closure
+    return closures
+
+
+def compute_install_closure(G, modules):
+    """Compute the modules Odoo actually installs along with `modules`.
+    
+    Starts from the dependencies closure of the modules, then adds every
+    installable auto_install module whose triggers are all in the set (with
+    its own dependencies), until nothing changes - the way Odoo pulls in
+    glue modules such as sale_stock once sale and stock are installed.
+    
+    Args:
+        G: NetworkX dependency graph whose nodes carry module attributes
+        modules: Iterable of module names
+        
+    Returns:
+        Tuple of (installed, auto_installed): the set of installed modules
+        and the subset pulled in by auto_install triggers
+    """
+    installed = set().union(*compute_closures(G, modules, 'dependencies').values())
+    explicit = set(installed)
+    candidates = [
+        (module, attributes['auto_install_triggers'])
+        for module, attributes in G.nodes(data=True)
+        if attributes.get('auto_install') and attributes.get('installable', True)
+    ]
+    while True:
+        triggered = [module for module, triggers in candidates
+                     if module not in installed and installed.issuperset(triggers)]
+        if not triggered:
+            break
+        installed.update(*compute_closures(G, triggered, 'dependencies').values())
+    return installed, installed - explicit
+
+
+def module_python_files(module_path):
+    """Yield the Python files of a module that get imported, skipping its manifest.
+    
+    The manifest is read by the module loader, never imported.
+    """
+    for file_path in walk_files(module_path, extensions=('.py',)):
+        if os.path.basename(file_path) != '__manifest__.py':
+            yield file_path
+
+
+def estimate_import_cost(G, modules):
+    """Estimate what loading `modules` costs: their Python code and external dependencies.
+    
+    Returns:
+        Dict with the 'python_files' count, their total 'python_bytes', and the
+        sorted 'external_python' packages and 'external_bin' executables required
+    """
+    cost = {'python_files': 0, 'python_bytes': 0, 'external_python': set(), 'external_bin': set()}
+    for module in modules:
+        attributes = G.nodes[module]
+        external_dependencies = attributes.get('external_dependencies') or {}
+        if not isinstance(external_dependencies, dict):
+            # Graph files written by other tools may hold anything here
+            external_dependencies = {}
+        cost['external_python'].update(external_dependencies.get('python', ()))
+        cost['external_bin'].update(external_dependencies.get('bin', ()))
+        if not attributes.get('path'):
+            continue
+        for file_path in module_python_files(attributes['path']):
+            cost['python_files'] += 1
+            try:
+                cost['python_bytes'] += os.path.getsize(file_path)
+            except OSError:
+                pass
+    cost['external_python'] = sorted(cost['external_python'])
+    cost['external_bin'] = sorted(cost['external_bin'])
+    return cost
+
+
+def plan_install_order(G, modules=None, upgrade=False, auto_install=False):
+    """Plan the order in which modules can be installed.
+    
+    Modules are grouped in waves: a wave only depends on modules of earlier
+    waves, so all the modules of a wave could be installed in parallel. Like
+    Odoo's module loader, the order is by dependency depth, then by name, so
+    the same graph always yields the same plan.
+    
+    Args:
+        G: NetworkX dependency graph (edges go from a module to its dependencies)
+        modules: Optional iterable of module names to plan for; by default
+                 every module of G is planned
+        upgrade: Plan the modules affected by upgrading `modules` (their
+                 dependents) instead of those needed to install them
+        auto_install: Also plan the auto_install modules that installing
+                      `modules` pulls in (see compute_install_closure())
+        
+    Returns:
+        Dict with 'order' (list of module names), 'waves' (list of sorted
+        lists of module names) and 'critical_path' (the longest dependency
+        chain, from its deepest dependency up)
+        
+    Raises:
+        nx.NetworkXUnfeasible: If the planned modules contain a dependency cycle
+    """
+    if modules is not None and auto_install and not upgrade:
+        G = G.subgraph(compute_install_closure(G, modules)[0])
+    elif modules is not None:
+        closures = compute_closures(G, modules, 'dependents' if upgrade else 'dependencies')
+        G = G.subgraph(set().union(*closures.values()))
+    
+    # Dependencies first: reverse the edges so that they go towards dependents
+    install_graph = G.reverse(copy=False)
+    waves = [sorted(wave) for wave in nx.topological_generations(install_graph)]
+    
+    # Longest chain through the waves, walked back from a module of the last wave
+    wave_index = {module: index for index, wave in enumerate(waves) for module in wave}
+    critical_path = []
+    if waves:
+        module = waves[-1][0]
+        critical_path.append(module)
+        while wave_index[module] > 0:
+            module = min(dependency for dependency in G.successors(module)
+                         if wave_index[dependency] == wave_index[module] - 1)
+            critical_path.append(module)
+        critical_path.reverse()
+    
+    return {
+        'order': [module for wave in waves for module in wave],
+        'waves': waves,
+        'critical_path': critical_path,
+    }
+
+
+def _closure_sizes(condensed, reachable):
+    """Count the modules reached by each component of a condensation, itself excluded."""
+    sizes = [len(condensed.nodes[component]['members']) for component in range(len(condensed))]
+    # Components of one module are counted with a popcount, the few cycles one by one
+    single_mask = sum(1 << component for component, size in enumerate(sizes) if size == 1)
+    cycles = [(component, size) for component, size in enumerate(sizes) if size > 1]
+    counts = {}
+    for component, bits in reachable.items():
+        count = bin(bits & single_mask).count('1')
+        count += sum(size for cycle, size in cycles if bits >> cycle & 1)
+        counts[component] = count - 1
+    return counts
+
+
+def compute_module_metrics(G, betweenness_samples=None):
+    """Compute the structural metrics of every module.
+    
+    Reachability uses the condensation bitset sweep of compute_closures(),
+    so the transitive counts of all modules cost two passes over the graph.
+    
+    Metrics:
+        fan_in / fan_out: direct dependents / dependencies
+        transitive_dependents: modules needing the module, directly or not
+            (its "blast radius": what an upgrade of it touches)
+        transitive_dependencies: modules the module needs, directly or not
+        depth: length of the longest dependency chain below the module
+            (modules of a cycle count as one level)
+        betweenness: betweenness centrality, how many shortest dependency
+            chains go through the module
+        scc / scc_size: strongly connected component id and size; a size
+            above 1 means the module is part of a dependency cycle
+    
+    Args:
+        G: NetworkX dependency graph
+        betweenness_samples: Estimate betweenness from this many sampled
+                             source modules instead of all of them (faster
+                             on large graphs, deterministic)
+        
+    Returns:
+        List of dicts, one per module, sorted by module name
+    """
+    condensed, reachable = _reachability_bitsets(G)
+    mapping = condensed.graph['mapping']
+    dependency_counts = _closure_sizes(condensed, reachable)
+    
+    reversed_condensed, reversed_reachable = _reachability_bitsets(G.reverse(copy=False))
+    reversed_mapping = reversed_condensed.graph['mapping']
+    dependent_counts = _closure_sizes(reversed_condensed, reversed_reachable)
+    
+    # Longest chain, dependencies first
+    depths = {}
+    for component in reversed(list(nx.topological_sort(condensed))):
+        depths[component] = max((depths[successor] + 1 for successor in condensed.successors(component)),
+                                default=0)
+    
+    if betweenness_samples and betweenness_samples < len(G):
+        betweenness = nx.betweenness_centrality(G, k=betweenness_samples, seed=0)
+    else:
+        betweenness = nx.betweenness_centrality(G)
+    
+    metrics = []
+    for module in sorted(G.nodes()):
+        component = mapping[module]
+        metrics.append({
+            'module': module,
+            'fan_in': G.in_degree(module),
+            'fan_out': G.out_degree(module),
+            'transitive_dependents': dependent_counts[reversed_mapping[module]],
+            'transitive_dependencies': dependency_counts[component],
+            'depth': depths[component],
+            'betweenness': round(betweenness[module], 6),
+            'scc': component,
+            'scc_size': len(condensed.nodes[component]['members']),
+        })
+    return metrics
+
+
+def transitive_reduction(G):
+    """Drop the edges implied by longer dependency chains.
+    
+    An edge A -> C is redundant when A also reaches C through another
+    dependency (A -> B -> C); removing it keeps the same reachability with far
+    fewer edges to lay out. Edges inside dependency cycles are kept. Uses the
+    same bitset sweep as compute_closures(), so it stays fast on thousands of
+    modules.
+    
+    Args:
+        G: NetworkX dependency graph
+        
+    Returns:
+        New NetworkX DiGraph with the nodes of G and its non-redundant edges,
+        attributes included (e.g. the weights of a collapsed graph)
+    """
+    condensed, reachable = _reachability_bitsets(G)
+    mapping = condensed.graph['mapping']
+    
+    # Components reached through each component's successors, not counting the successors themselves
+    kept_edges = set()
+    for component in condensed.nodes():
+        successors = list(condensed.successors(component))
+        indirect = 0
+        for successor in successors:
+            indirect |= reachable[successor] ^ (1 << successor)
+        kept_edges.update((component, successor) for successor in successors if not indirect >> successor & 1)
+    
+    reduced = nx.DiGraph()
+    reduced.add_nodes_from(G.nodes(data=True))
+    reduced.add_edges_from(
+        (module, dependency, data) for module, dependency, data in G.edges(data=True)
+        if mapping[module] == mapping[dependency] or (mapping[module], mapping[dependency]) in kept_edges
+    )
+    return reduced
+
+
+def collapse_graph(G, group_by):
+    """Collapse modules into one node per repository or category.
+    
+    Args:
+        G: NetworkX dependency graph whose nodes carry module attributes
+        group_by: Node attribute to group on ('repository' or 'category');
+                  modules without it (missing dependencies) are grouped together
+        
+    Returns:
+        NetworkX DiGraph of the groups; each node has a 'modules' count and
+        each edge a 'weight' (number of module dependencies it stands for)
+    """
+    groups = {module: attributes.get(group_by) or '(not found)' for module, attributes in G.nodes(data=True)}
+    if group_by == 'repository':
+        # Name repositories by their directory name, unless two of them share it
+        names = {}
+        for repository in set(groups.values()):
+            names.setdefault(os.path.basename(repository), []).append(repository)
+        short_names = {repository: name for name, repositories in names.items()
+                       if len(repositories) == 1 for repository in repositories}
+        groups = {module: short_names.get(group, group) for module, group in groups.items()}
+    
+    collapsed = nx.DiGraph()
+    for group in sorted(set(groups.values())):
+        collapsed.add_node(group, modules=0)
+    for module in G.nodes():
+        collapsed.nodes[groups[module]]['modules'] += 1
+    for module, dependency in G.edges():
+        source, target = groups[module], groups[dependency]
+        if source == target:
+            continue
+        if collapsed.has_edge(source, target):
+            collapsed[source][target]['weight'] += 1
+        else:
+            collapsed.add_edge(source, target, weight=1)
+    return collapsed
+
+
+def visualize_with_graphviz(G, output_file=None, output_dir=None, format_type='svg',
+                            large_graph=None, collapse=None, engine=None,
+                            threshold=LARGE_GRAPH_THRESHOLD, render=True, force=False):
     """Visualize the dependency graph using Graphviz.
     
+    Graphs with more than `threshold` nodes are drawn in large-graph mode:
+    redundant edges are dropped by transitive reduction and, if the graph is
+    still that big, the force-directed sfdp engine replaces dot, whose layout
+    takes minutes on thousands of modules.
+    
+    Rendering is skipped when the DOT file already holds the same content
+    and the rendered file is newer than it, unless `force` is set.
+    
     Args:
         G: NetworkX graph object
         output_file: Name of the output file without extension
         output_dir: Directory to save the output files
         format_type: Output format (default: svg)
+        large_graph: Force (True) or disable (False) large-graph mode;
+                     None enables it above `threshold` nodes
+        collapse: Optional 'repository' or 'category' to draw one node per group
+        engine: Graphviz layout engine overriding the automatic choice
+        threshold: Node count above which the graph is considered large
+        render: Render the DOT file; if False it is only saved and, when it
+                needs rendering, (dot_file_path, None) is returned so that the
+                caller renders it with render_dot_file()
+        force: Render even if the rendered file is up to date
         
     Returns:
         Tuple of (dot_file_path, rendered_file_path)
     """
+    module_count = len(G.nodes())
+    edge_count = len(G.edges())
+    leaf_modules = sum(1 for n in G.nodes() if G.out_degree(n) == 0)
+    base_modules = sum(1 for n in G.nodes() if G.in_degree(n) == 0)
+    
+    if large_graph is None:
+        large_graph = module_count > threshold
+    if collapse:
+        G = collapse_graph(G, collapse)
+        print(f"Collapsed {module_count} modules into {len(G)} {collapse} groups.")
+    if large_graph:
+        drawn_edge_count = len(G.edges())
+        G = transitive_reduction(G)
+        print(f"Large-graph mode: transitive reduction kept {len(G.edges())} of {drawn_edge_count} edges.")
+    if not engine:
+        engine = LARGE_GRAPH_ENGINE if large_graph and len(G) > threshold else 'dot'
+    print(f"Layout engine: {engine}")
+    
     # Create Digraph
-    dot = Digraph(comment='Odoo Modules Dependency Graph')
-    dot.attr(rankdir='LR', ratio='fill')
+    dot = Digraph(comment='Odoo Modules Dependency Graph', engine=engine)
+    if engine == 'dot':
+        dot.attr(rankdir='LR', ratio='fill')
+    else:
+        # Force-directed layouts: remove overlaps, straight edges drawn below the nodes.
+        # The layout attribute keeps the engine when the DOT file is rendered later on.
+        dot.attr(layout=engine, overlap='prism', splines='false', outputorder='edgesfirst')
     dot.attr('node', shape='box', style='filled', fontname='Arial')
     dot.attr('edge', fontname='Arial')
     
     # Count how many modules depend on each module
-    dependency_count = {}
-    for node in G.nodes():
-        dependency_count[node] = len(list(G.predecessors(node)))
-    print(f"Dependency count: {dependency_count}")
+    dependency_count = dict(G.in_degree())
     
     # Find max dependency count for normalization
     max_deps = max(1,max(dependency_count.values())) if dependency_count else 1
     print(f"Max dependencies: {max_deps}")
     
     # Add nodes with styling based on dependencies
-    for node in G.nodes():
-        # Node label with module name
-        label = node
+    for node, attributes in sorted(G.nodes(data=True)):
+        # Node label with module name (and module count of collapsed groups)
+        label = f"{node}\n{attributes['modules']} modules" if collapse else node
         
         # Node color based on dependencies
         deps_normalized = dependency_count[node] / max_deps
@@ -155,24 +857,25 @@ def visualize_with_graphviz(G, output_file=None, output_dir=None, format_type='s
         # Add node with attributes
         dot.node(node, label, style='filled', fillcolor=color, fontsize='12')
     
-    # Add edges
-    for edge in G.edges():
-        dot.edge(edge[0], edge[1])
+    # Add edges, drawn thicker when they stand for several module dependencies
+    for source, target, attributes in sorted(G.edges(data=True)):
+        if collapse:
+            weight = attributes['weight']
+            dot.edge(source, target, label=str(weight), penwidth=str(min(1 + weight / 5, 8)))
+        else:
+            dot.edge(source, target)
     
     # Add a legend as a subgraph
     with dot.subgraph(name='cluster_legend') as legend:
         legend.attr(label='Legend', fontsize='14', fontname='Arial', color='gray')
         
-        # Stats
-        module_count = len(G.nodes())
-        edge_count = len(G.edges())
-        leaf_modules = sum(1 for n in G.nodes() if G.out_degree(n) == 0)
-        base_modules = sum(1 for n in G.nodes() if G.in_degree(n) == 0)
-        
+        # Stats (of the modules, whatever was collapsed or reduced)
         stats = f"Total Modules: {module_count}\\l"
         stats += f"Total Dependencies: {edge_count}\\l"
         stats += f"Leaf Modules: {leaf_modules}\\l"
         stats += f"Base Modules: {base_modules}\\l"
+        if large_graph:
+            stats += f"Edges Drawn (transitive reduction): {len(G.edges())}\\l"
         
         legend.node('stats', stats, shape='note', fontsize='12', fontname='Arial')
     
@@ -195,44 +898,594 @@ def visualize_with_graphviz(G, output_file=None, output_dir=None, format_type='s
         # Default to current directory
         output_dir = os.getcwd()
     
-    # Full path for dot and output files
+    # Full path for dot and output files (Graphviz appends the format to the DOT file name)
     dot_path = os.path.join(output_dir, f"{filename}.gv")
-    output_path = os.path.join(output_dir, f"{filename}.{format_type}")
+    output_path = f"{dot_path}.{format_type}"
+    
+    if not force and is_rendered(dot_path, dot.source, output_path):
+        print(f"{output_path} is up to date, skipping render")
+        return dot_path, output_path
     
     # Save the dot file
     dot.save(dot_path)
     print(f"Graphviz DOT file saved to {dot_path}")
+    if not render:
+        return dot_path, None
     
     # Render the graph
+    output_path = render_dot_file(dot_path, format_type, engine)
+    return dot_path, output_path
+
+
+def is_rendered(dot_path, source, output_path):
+    """Tell whether `dot_path` holds `source` and `output_path` was rendered from it."""
+    try:
+        with open(dot_path, 'rb') as f:
+            unchanged = hashlib.sha1(f.read()).digest() == hashlib.sha1(source.encode('utf-8')).digest()
+        return unchanged and os.path.getmtime(output_path) >= os.path.getmtime(dot_path)
+    except OSError:
+        return False
+
+
+def render_dot_file(dot_path, format_type='svg', engine='dot'):
+    """Render a saved DOT file, keeping the DOT file.
+    
+    Returns:
+        Path of the rendered file, or None if rendering failed
+    """
     try:
-        dot.render(dot_path, format=format_type, cleanup=False)  # Don't cleanup to keep the dot file
+        output_path = graphviz.render(engine, format_type, dot_path)
         print(f"{format_type.upper()} file saved to {output_path}")
-        return dot_path, output_path
+        return output_path
     except Exception as e:
-        print(f"Error rendering {format_type.upper()}: {e}")
-        return dot_path, None
+        print(f"Error rendering {format_type.upper()} of {dot_path}: {e}")
+        return None
 
 
-def generate_adjacency_list(G, output_file=None):
-    """Generate an adjacency list of module dependencies."""
-    lines = []
-    for module in sorted(G.nodes()):
-        dependencies = sorted(G.successors(module))
-        dependents = sorted(G.predecessors(module))
+def visualize_many(targets, output_dir=None, format_type='svg', jobs=None, force=False, **render_options):
+    """Save the DOT files of several graphs, then render them in parallel.
+    
+    The graphs are drawn one after the other, then the DOT files that are not
+    up to date are rendered concurrently, each in its own Graphviz process.
+    
+    Args:
+        targets: List of (G, output_file) pairs
+        output_dir: Directory to save the output files
+        format_type: Output format (default: svg)
+        jobs: Number of rendering processes (default: number of CPUs)
+        force: Render even the files that are up to date
+        **render_options: Passed to visualize_with_graphviz()
+        
+    Returns:
+        List of (dot_file_path, rendered_file_path) tuples, in the order of `targets`
+    """
+    results = [
+        visualize_with_graphviz(G, output_file, output_dir, format_type, render=False, force=force,
+                                **render_options)
+        for G, output_file in targets
+    ]
+    
+    pending = [dot_path for dot_path, output_path in results if output_path is None]
+    if not pending:
+        return results
+    print(f"Rendering {len(pending)} graph(s)...")
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        rendered = dict(zip(pending, executor.map(partial(render_dot_file, format_type=format_type), pending)))
+    return [(dot_path, output_path or rendered[dot_path]) for dot_path, output_path in results]
+
+
+def generate_adjacency_list(G, output_file=None, format_type='text', root=None, max_depth=None,
+                            min_fan_in=0, min_fan_out=0):
+    """Generate an adjacency list of module dependencies.
+    
+    Modules are written one at a time, straight to the file (or stdout), so
+    memory use does not grow with the report.
+    
+    Formats:
+        text: "Module:", "Depends on:" and "Used by:" lines per module
+        csv: module,fan_in,fan_out,depends_on,used_by rows, lists separated by ';'
+        jsonl: one JSON object per module
+    
+    Args:
+        G: NetworkX dependency graph
+        output_file: File to write, stdout if None or '-'
+        format_type: 'text', 'csv' or 'jsonl'
+        root: Optional module; only modules within `max_depth` dependency
+              levels of it (as dependencies or dependents) are listed
+        max_depth: Depth limit around `root`, None for its whole closure
+        min_fan_in: Only list modules used by at least this many modules
+        min_fan_out: Only list modules depending on at least this many modules
         
-        lines.append(f"Module: {module}")
-        lines.append(f"  Depends on: {', '.join(dependencies) if dependencies else 'None'}")
-        lines.append(f"  Used by: {', '.join(dependents) if dependents else 'None'}")
-        lines.append("")
+    Returns:
+        int: Number of modules written
+    """
+    if root is not None:
+        depths = nx.single_source_shortest_path_length(G, root, cutoff=max_depth)
+        for module, depth in nx.single_source_shortest_path_length(G.reverse(copy=False), root,
+                                                                   cutoff=max_depth).items():
+            depths[module] = min(depth, depths.get(module, depth))
+        modules = sorted(depths)
+    else:
+        modules = sorted(G.nodes())
     
-    text = "\n".join(lines)
+    to_stdout = not output_file or output_file == '-'
+    f = sys.stdout if to_stdout else open(output_file, 'w', encoding='utf-8', newline='')
+    count = 0
+    try:
+        writer = csv.writer(f, lineterminator='\n') if format_type == 'csv' else None
+        if writer:
+            writer.writerow(['module', 'fan_in', 'fan_out', 'depends_on', 'used_by'])
+        for module in modules:
+            if G.in_degree(module) < min_fan_in or G.out_degree(module) < min_fan_out:
+                continue
+            dependencies = sorted(G.successors(module))
+            dependents = sorted(G.predecessors(module))
+            count += 1
+            
+            if writer:
+                writer.writerow([module, len(dependents), len(dependencies),
+                                 ';'.join(dependencies), ';'.join(dependents)])
+            elif format_type == 'jsonl':
+                record = {'module': module, 'depends_on': dependencies, 'used_by': dependents}
+                if root is not None:
+                    record['depth'] = depths[module]
+                f.write(json.dumps(record) + '\n')
+            else:
+                f.write(f"Module: {module}\n")
+                f.write(f"  Depends on: {', '.join(dependencies) if dependencies else 'None'}\n")
+                f.write(f"  Used by: {', '.join(dependents) if dependents else 'None'}\n")
+                f.write("\n")
+    finally:
+        if not to_stdout:
+            f.close()
     
-    if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(text)
+    if not to_stdout:
         print(f"Adjacency list saved to {output_file}")
+    return count
+
+
+def graph_file_format(file_path, format_type=None):
+    """Return the export format of a graph file, from its extension unless given."""
+    if format_type:
+        return format_type
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in GRAPH_FILE_FORMATS:
+        raise ValueError(f"Cannot tell the graph format of '{file_path}', "
+                         f"use one of the extensions {', '.join(GRAPH_FILE_FORMATS)}")
+    return GRAPH_FILE_FORMATS[extension]
+
+
+def export_graph(G, output_file, format_type=None):
+    """Write the dependency graph to a file other tools can load.
+    
+    Formats:
+        json: {"format": ..., "modules": {name: {attributes..., "depends": [...]}}},
+              the module metadata included; modules without attributes are
+              dependencies whose manifest was not found
+        graphml: GraphML with the module metadata as node attributes (lists
+                 and dicts are stored as JSON strings)
+        edgelist: One "module dependency" line per edge and one line per
+                  isolated module, without metadata
+    
+    Args:
+        G: NetworkX dependency graph
+        output_file: Path of the file to write
+        format_type: 'json', 'graphml' or 'edgelist'; guessed from the
+                     extension of output_file if None
+    """
+    format_type = graph_file_format(output_file, format_type)
+    if format_type == 'graphml':
+        H = nx.DiGraph()
+        for module, attributes in G.nodes(data=True):
+            H.add_node(module, **{
+                key: json.dumps(value) if isinstance(value, (list, tuple, dict)) else value
+                for key, value in attributes.items()
+            })
+        H.add_edges_from(G.edges())
+        nx.write_graphml(H, output_file)
+        return
+    
+    with open(output_file, 'w', encoding='utf-8') as f:
+        if format_type == 'json':
+            modules = {
+                module: dict(attributes, depends=sorted(G.successors(module)))
+                for module, attributes in sorted(G.nodes(data=True))
+            }
+            json.dump({'format': GRAPH_JSON_FORMAT, 'modules': modules}, f, separators=(',', ':'))
+        else:
+            for module in sorted(G.nodes()):
+                dependencies = sorted(G.successors(module))
+                if not dependencies and not G.in_degree(module):
+                    f.write(f"{module}\n")
+                for dependency in dependencies:
+                    f.write(f"{module} {dependency}\n")
+
+
+def load_graph_file(input_file, format_type=None):
+    """Load a dependency graph written by export_graph().
+    
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a graph in the expected format
+    """
+    format_type = graph_file_format(input_file, format_type)
+    if format_type == 'graphml':
+        G = nx.DiGraph(nx.read_graphml(input_file))
+        for _, attributes in G.nodes(data=True):
+            for key in STRUCTURED_ATTRIBUTES:
+                if isinstance(attributes.get(key), str):
+                    attributes[key] = json.loads(attributes[key])
+        return G
+    
+    G = nx.DiGraph()
+    with open(input_file, encoding='utf-8') as f:
+        if format_type == 'json':
+            data = json.load(f)
+            if not isinstance(data, dict) or data.get('format') != GRAPH_JSON_FORMAT:
+                raise ValueError(f"'{input_file}' is not a dependency graph exported by this script")
+            for module, attributes in data['modules'].items():
+                attributes = dict(attributes)
+                dependencies = attributes.pop('depends', [])
+                G.add_node(module, **attributes)
+                G.add_edges_from((module, dependency) for dependency in dependencies)
+        else:
+            for line in f:
+                names = line.split()
+                if len(names) == 1:
+                    G.add_node(names[0])
+                elif len(names) == 2:
+                    G.add_edge(*names)
+                elif names:
+                    raise ValueError(f"Unexpected edge list line in '{input_file}': {line.strip()}")
+    return G
+
+
+# Questions answered by the query command: name -> (arguments, description)
+QUERIES = {
+    'dependents': (['MODULE'], 'modules depending on MODULE, directly or not'),
+    'dependencies': (['MODULE'], 'modules MODULE depends on, directly or not'),
+    'path': (['FROM', 'TO'], 'shortest dependency chain from FROM to TO'),
+    'breaks': (['MODULE'], 'modules that can no longer be installed if MODULE is removed'),
+    'info': (['MODULE'], 'metadata and direct dependencies of MODULE'),
+    'installs': (['MODULE'], 'modules installed with MODULE, auto_install modules included'),
+}
+
+
+def answer_query(G, words):
+    """Answer one dependency question about the graph.
+    
+    Args:
+        G: NetworkX dependency graph
+        words: Query name followed by its arguments, see QUERIES
+        
+    Returns:
+        Dict describing the answer (JSON serializable)
+        
+    Raises:
+        ValueError: If the query is unknown, malformed or names a missing module
+    """
+    if not words or words[0] not in QUERIES:
+        raise ValueError(f"Unknown query, expected one of: {', '.join(QUERIES)}")
+    query, arguments = words[0], words[1:]
+    expected = QUERIES[query][0]
+    if len(arguments) != len(expected):
+        raise ValueError(f"Usage: {query} {' '.join(expected)}")
+    missing_modules = [module for module in arguments if module not in G]
+    if missing_modules:
+        raise ValueError(f"Module(s) not found in the dependency graph: {', '.join(missing_modules)}")
+    
+    if query == 'path':
+        source, target = arguments
+        try:
+            path = nx.shortest_path(G, source, target)
+        except nx.NetworkXNoPath:
+            path = []
+        return {'query': query, 'from': source, 'to': target, 'path': path}
+    
+    module = arguments[0]
+    if query == 'info':
+        return {'query': query, 'module': module, **G.nodes[module],
+                'depends': sorted(G.successors(module)),
+                'depended_on_by': sorted(G.predecessors(module))}
+    
+    if query == 'installs':
+        installed, auto_installed = compute_install_closure(G, [module])
+        installed.discard(module)
+        return {'query': query, 'module': module, 'count': len(installed), 'modules': sorted(installed),
+                'auto_installed': sorted(auto_installed)}
+    
+    direction = 'dependencies' if query == 'dependencies' else 'dependents'
+    closure = compute_closures(G, [module], direction)[module]
+    closure.discard(module)
+    return {'query': query, 'module': module, 'count': len(closure), 'modules': sorted(closure)}
+
+
+def format_query_answer(answer):
+    """Format an answer of answer_query() as text."""
+    query = answer['query']
+    if query == 'path':
+        if not answer['path']:
+            return f"{answer['from']} does not depend on {answer['to']}"
+        return ' -> '.join(answer['path'])
+    if query == 'info':
+        return '\n'.join(f"{key}: {', '.join(value) if isinstance(value, list) else value}"
+                         for key, value in answer.items() if key != 'query')
+    description = QUERIES[query][1].replace('MODULE', answer['module'])
+    lines = [f"{description[0].upper()}{description[1:]}: {answer['count']}"]
+    lines += [f"  {module}{' (auto_install)' if module in answer.get('auto_installed', ()) else ''}"
+              for module in answer['modules']]
+    return '\n'.join(lines)
+
+
+def modules_of_files(G, file_paths):
+    """Map files to the modules that own them.
+    
+    A file belongs to the module whose directory (the 'path' node attribute)
+    is its closest parent. Files of shadowed or unknown modules, and files
+    outside of any module, are not owned.
+    
+    Args:
+        G: NetworkX dependency graph whose nodes carry module attributes
+        file_paths: Iterable of file paths
+        
+    Returns:
+        Tuple of (modules, unowned_files): the set of owning modules and the
+        list of files no module owns
+    """
+    module_by_path = {
+        os.path.realpath(attributes['path']): module
+        for module, attributes in G.nodes(data=True) if attributes.get('path')
+    }
+    modules = set()
+    unowned_files = []
+    for file_path in file_paths:
+        directory = os.path.dirname(os.path.realpath(file_path))
+        while directory not in module_by_path:
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+        if directory in module_by_path:
+            modules.add(module_by_path[directory])
+        else:
+            unowned_files.append(file_path)
+    return modules, unowned_files
+
+
+def git_changed_files(revision_range, repository='.'):
+    """List the files changed in a git revision range, as absolute paths.
+    
+    Raises:
+        OSError: If git cannot be run
+        subprocess.CalledProcessError: If git fails (not a repository, unknown revision, ...)
+    """
+    def git(*arguments):
+        return subprocess.run(['git', '-C', repository, *arguments], check=True,
+                              capture_output=True, text=True).stdout
+    
+    toplevel = git('rev-parse', '--show-toplevel').strip()
+    return [os.path.join(toplevel, name) for name in git('diff', '--name-only', revision_range).splitlines() if name]
+
+
+def compute_impact(G, changed_modules):
+    """Return the modules to test after changing `changed_modules`: themselves and all their dependents."""
+    closures = compute_closures(G, changed_modules, 'dependents')
+    return set().union(*closures.values())
+
+
+def _addon_of_import(dotted_name):
+    """Return the addon imported by a dotted module name, None if it is not an addon import."""
+    parts = dotted_name.split('.')
+    if len(parts) > 2 and parts[0] in ('odoo', 'openerp') and parts[1] == 'addons':
+        return parts[2]
+    return None
+
+
+def _literal_value(node):
+    """Evaluate a literal AST node, None if it is not a literal."""
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def scan_python_file(file_path):
+    """Collect the addon imports and the models defined and inherited by a Python file.
+    
+    Returns:
+        Dict with 'imports' (list of (addon, line)), 'defines' (list of model
+        names declared with _name) and 'inherits' (list of (model, line) of
+        the models extended through _inherit or _inherits)
+    """
+    result = {'imports': [], 'defines': [], 'inherits': []}
+    content = read_text(file_path)
+    if content is None:
+        return result
+    try:
+        tree = ast.parse(content, filename=file_path)
+    except (SyntaxError, ValueError):
+        return result
+    
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                addon = _addon_of_import(alias.name)
+                if addon:
+                    result['imports'].append((addon, node.lineno))
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            if node.module in ('odoo.addons', 'openerp.addons'):
+                # from odoo.addons import sale
+                result['imports'].extend((alias.name, node.lineno) for alias in node.names)
+            else:
+                addon = _addon_of_import(node.module)
+                if addon:
+                    result['imports'].append((addon, node.lineno))
+        elif isinstance(node, ast.ClassDef):
+            attributes = {}
+            for statement in node.body:
+                if (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+                        and isinstance(statement.targets[0], ast.Name)
+                        and statement.targets[0].id in ('_name', '_inherit', '_inherits')):
+                    attributes[statement.targets[0].id] = (_literal_value(statement.value), statement.lineno)
+            name = attributes.get('_name', (None, 0))[0]
+            inherit, inherit_line = attributes.get('_inherit', (None, 0))
+            inherit = [inherit] if isinstance(inherit, str) else list(inherit or ())
+            inherits, inherits_line = attributes.get('_inherits', (None, 0))
+            if isinstance(name, str) and name not in inherit:
+                result['defines'].append(name)
+            result['inherits'].extend((model, inherit_line) for model in inherit if isinstance(model, str))
+            if isinstance(inherits, dict):
+                result['inherits'].extend((model, inherits_line) for model in inherits if isinstance(model, str))
+    return result
+
+
+def default_scan_cache_path(addons_paths):
+    """Return the default Python scan cache file for an ordered list of addons paths."""
+    return default_graph_cache_path(addons_paths).replace('graph_', 'scan_')
+
+
+def scan_module_files(G, cache_path=None, rebuild=False, jobs=None):
+    """Scan the Python files of every module of the graph.
+    
+    Files are parsed in a process pool; the results are cached by path and
+    (mtime, size), so only new or modified files are parsed again.
+    
+    Args:
+        G: NetworkX dependency graph whose nodes carry module attributes
+        cache_path: Cache file to reuse and refresh (None disables caching)
+        rebuild: Ignore the cache content and parse every file
+        jobs: Number of parsing processes (default: number of CPUs)
+        
+    Returns:
+        Dict mapping each module to a list of (relative_path, scan_result)
+        pairs, see scan_python_file()
+    """
+    cache = {}
+    if cache_path and not rebuild:
+        try:
+            with open(cache_path, 'rb') as f:
+                data = pickle.load(f)
+            if isinstance(data, dict) and data.get('version') == SCAN_CACHE_VERSION:
+                cache = data['files']
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"Warning: ignoring unreadable scan cache {cache_path}: {e}")
+    
+    module_files = {}
+    files = {}
+    stale_files = []
+    for module, attributes in sorted(G.nodes(data=True)):
+        if not attributes.get('path'):
+            continue
+        module_files[module] = []
+        for file_path in module_python_files(attributes['path']):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            entry = cache.get(file_path)
+            if not entry or entry['signature'] != signature:
+                entry = {'signature': signature, 'result': None}
+                stale_files.append(file_path)
+            files[file_path] = entry
+            module_files[module].append(file_path)
+    
+    if len(stale_files) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(scan_python_file, stale_files, chunksize=64)
+            for file_path, result in zip(stale_files, results):
+                files[file_path]['result'] = result
     else:
-        print(text)
+        for file_path in stale_files:
+            files[file_path]['result'] = scan_python_file(file_path)
+    print(f"Parsed {len(stale_files)} Python file(s), {len(files) - len(stale_files)} loaded from cache.")
+    
+    if cache_path and (stale_files or len(files) != len(cache)):
+        save_graph_cache(cache_path, {'version': SCAN_CACHE_VERSION, 'files': files})
+    
+    return {
+        module: [(os.path.relpath(file_path, G.nodes[module]['path']), files[file_path]['result'])
+                 for file_path in file_paths]
+        for module, file_paths in module_files.items()
+    }
+
+
+def check_module_dependencies(G, module_scans):
+    """Check the declared dependencies against what the modules' code uses.
+    
+    Issues:
+        missing: a declared dependency, or an imported addon, is not in the
+            scanned addons paths
+        undeclared: the module imports an addon (odoo.addons.X) or extends a
+            model (_inherit / _inherits) owned by a module it does not
+            depend on, directly or not
+        redundant: a declared dependency is already implied by another one
+    
+    Models are owned by the modules declaring them with _name; models whose
+    owner is not found (defined by the Odoo core, say) are not checked.
+    
+    Args:
+        G: NetworkX dependency graph whose nodes carry module attributes
+        module_scans: Result of scan_module_files()
+        
+    Returns:
+        List of issue dicts with 'module', 'issue', 'dependency' and 'reason',
+        sorted by module
+    """
+    owners = {}
+    for module, scans in module_scans.items():
+        for _, result in scans:
+            for model in result['defines']:
+                owners.setdefault(model, set()).add(module)
+    closures = compute_closures(G, G.nodes(), 'dependencies')
+    
+    issues = []
+    for module in sorted(G.nodes()):
+        for dependency in sorted(G.successors(module)):
+            if not G.nodes[dependency].get('path'):
+                issues.append({'module': module, 'issue': 'missing', 'dependency': dependency,
+                               'reason': 'declared in depends but not found in the addons paths'})
+    
+    for module, scans in module_scans.items():
+        closure = closures[module]
+        reported = set()
+        for relative_path, result in scans:
+            for addon, line in result['imports']:
+                if addon == module or (addon, 'import') in reported:
+                    continue
+                if addon not in G:
+                    issue = 'missing'
+                elif addon not in closure:
+                    issue = 'undeclared'
+                else:
+                    continue
+                reported.add((addon, 'import'))
+                issues.append({'module': module, 'issue': issue, 'dependency': addon,
+                               'reason': f"imports odoo.addons.{addon} in {relative_path}:{line}"})
+            for model, line in result['inherits']:
+                model_owners = owners.get(model)
+                if not model_owners or module in model_owners or model_owners & closure:
+                    continue
+                owner = sorted(model_owners)[0]
+                if (owner, 'model') in reported:
+                    continue
+                reported.add((owner, 'model'))
+                issues.append({'module': module, 'issue': 'undeclared', 'dependency': owner,
+                               'reason': f"extends model '{model}' in {relative_path}:{line}"})
+    
+    # Declared dependencies that transitive reduction drops are implied by another one
+    reduced = transitive_reduction(G)
+    for module, dependency in sorted(G.edges()):
+        if module in module_scans and not reduced.has_edge(module, dependency):
+            implied_by = next((other for other in sorted(G.successors(module))
+                               if other != dependency and dependency in closures[other]), None)
+            issues.append({'module': module, 'issue': 'redundant', 'dependency': dependency,
+                           'reason': f"already implied by {implied_by}" if implied_by else 'already implied'})
+    
+    issues.sort(key=lambda issue: (issue['module'], issue['issue'], issue['dependency']))
+    return issues
 
 
 def get_directory_input(default_dir='.'):
@@ -270,54 +1523,587 @@ def get_directory_input(default_dir='.'):
             print("Let's try again.\n")
 
 
+def add_graph_source_arguments(parser, graph_file=False):
+    """Add the arguments selecting the addons to scan, shared by all commands.
+    
+    With `graph_file`, also add --graph to read a file written by the export
+    command instead; load the graph with load_command_graph() then.
+    """
+    if graph_file:
+        parser.add_argument('--graph', '-g',
+                            help='Graph file written by the export command; when given, no addons are scanned')
+    parser.add_argument('--path', '-p', action='append', default=[],
+                        help='Path to an Odoo addons directory; repeat it or separate paths with commas. '
+                             'Earlier paths shadow modules of later ones, like Odoo\'s addons_path')
+    parser.add_argument('--config', '-c',
+                        help='Odoo configuration file whose addons_path is used (after any --path)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Parse every manifest without reading or writing the graph cache')
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help='Ignore the cached manifests and graph, parse everything again')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help='Skip directories whose path relative to the addons directory matches GLOB (repeatable)')
+    parser.add_argument('--max-depth', type=int, default=None,
+                        help='Deepest directory level searched for module roots (addons directory is 0). '
+                             'Default: 1 like Odoo with several paths or --config, no limit with a single path')
+    parser.add_argument('--jobs', '-j', type=int, default=8,
+                        help='Threads scanning the subdirectories of each addons path (default: 8)')
+
+
+def load_graph(args):
+    """Scan the addons selected by add_graph_source_arguments() and build the graph.
+    
+    Exits with status 1 if the paths are invalid or hold no manifest.
+    
+    Returns:
+        Tuple of (G, addons_paths)
+    """
+    # Collect the addons paths, in Odoo's priority order
+    addons_paths = [path.strip() for value in args.path for path in value.split(',') if path.strip()]
+    if args.config:
+        try:
+            addons_paths += read_addons_path_from_config(args.config)
+        except (OSError, configparser.Error) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    addons_paths = list(dict.fromkeys(os.path.abspath(path) for path in addons_paths))
+
+    # Validate directory paths
+    invalid_paths = [path for path in addons_paths if not os.path.isdir(path)]
+    if not addons_paths or invalid_paths:
+        for path in invalid_paths:
+            print(f"Error: '{path}' is not a valid directory.")
+        print("\nUsage:")
+        print("  python odoo_module_dependency_graph.py -p <addons_path> -m <module_name|all>")
+        print("  python odoo_module_dependency_graph.py -c <odoo.conf> -m <module_name|all>")
+        print("\nExamples:")
+        print("  python odoo_module_dependency_graph.py -p /path/to/addons -m all")
+        print("  python odoo_module_dependency_graph.py -p /path/to/addons,/path/to/custom -m module_name")
+        print("  python odoo_module_dependency_graph.py -c /etc/odoo/odoo.conf -m module_name")
+        sys.exit(1)
+
+    print(f"\nSearching for manifest files in {', '.join(addons_paths)}...")
+    # A real addons_path only loads the modules directly under each path
+    max_depth = args.max_depth
+    if max_depth is None and (args.config or len(addons_paths) > 1):
+        max_depth = 1
+    manifest_files, duplicates = find_modules_in_paths(addons_paths, exclude=args.exclude,
+                                                       max_depth=max_depth, jobs=args.jobs)
+    print(f"Found {len(manifest_files)} manifest files.")
+    for module_name, duplicate_manifests in sorted(duplicates.items()):
+        print(f"Warning: module '{module_name}' exists in several addons paths, "
+              f"using {duplicate_manifests[0]} (shadowed: {', '.join(duplicate_manifests[1:])})")
+
+    if not manifest_files:
+        print(f"Warning: No '__manifest__.py' files found in {', '.join(addons_paths)}. "
+              f"Is this an Odoo addons directory?")
+        print("Exiting.")
+        sys.exit(1)
+
+    print("\nCreating dependency graph...")
+    cache_path = None if args.no_cache else default_graph_cache_path(addons_paths)
+    G = build_dependency_graph(manifest_files, cache_path, rebuild=args.rebuild_cache)
+    return G, addons_paths
+
+
+def load_command_graph(args):
+    """Load the graph of a command: from its --graph file, or by scanning the addons.
+    
+    Progress messages go to stderr so that the command's output can be piped.
+    Exits with status 1 if the graph cannot be loaded.
+    """
+    if args.graph:
+        try:
+            return load_graph_file(args.graph)
+        except (OSError, ValueError, ET.ParseError) as e:
+            print(f"Error: cannot load graph file {args.graph}: {e}", file=sys.stderr)
+            sys.exit(1)
+    with contextlib.redirect_stdout(sys.stderr):
+        G, _ = load_graph(args)
+    return G
+
+
+def write_command_output(text, output_file=None):
+    """Write a command's result to a file, or to stdout if none is given."""
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"Output written to {output_file}", file=sys.stderr)
+    else:
+        sys.stdout.write(text)
+
+
+def install_order_command(argv):
+    """Print the install order and the parallel install waves of the modules."""
+    parser = argparse.ArgumentParser(
+        prog='odoo_module_dependency_graph.py install-order',
+        description='Plan a deterministic install order and the waves of modules '
+                    'that can be installed in parallel.',
+        epilog='Examples:\n'
+               '  odoo_module_dependency_graph.py install-order -p /path/to/addons\n'
+               '  odoo_module_dependency_graph.py install-order -c /etc/odoo/odoo.conf -m sale,crm\n'
+               '  odoo_module_dependency_graph.py install-order -p /path/to/addons -m base --upgrade --format json\n'
+               '  odoo_module_dependency_graph.py install-order -p /path/to/addons -m sale --auto-install --cost',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_graph_source_arguments(parser)
+    parser.add_argument('--module-name', '-m', action='append', default=[],
+                        help='Only plan for these modules (comma separated, repeatable); default: all modules')
+    parser.add_argument('--upgrade', action='store_true',
+                        help='Plan the modules affected by upgrading the -m modules (their dependents) '
+                             'instead of their dependencies')
+    parser.add_argument('--auto-install', action='store_true',
+                        help='Also plan the auto_install modules that installing the -m modules pulls in, '
+                             'like Odoo does')
+    parser.add_argument('--cost', action='store_true',
+                        help='Estimate the import cost of the planned modules: Python files and '
+                             'external dependencies')
+    parser.add_argument('--format', '-f', choices=['text', 'json'], default='text',
+                        help='Output format (default: text)')
+    parser.add_argument('--output', '-o', help='Write the plan to this file instead of stdout')
+    args = parser.parse_args(argv)
+    
+    # Progress goes to stderr so that the plan can be piped
+    with contextlib.redirect_stdout(sys.stderr):
+        G, _ = load_graph(args)
+    
+    modules = [name.strip() for value in args.module_name for name in value.split(',') if name.strip()]
+    missing_modules = [module for module in modules if module not in G]
+    if missing_modules:
+        print(f"Error: module(s) not found in the dependency graph: {', '.join(missing_modules)}", file=sys.stderr)
+        sys.exit(1)
+    
+    try:
+        plan = plan_install_order(G, modules or None, upgrade=args.upgrade, auto_install=args.auto_install)
+    except nx.NetworkXUnfeasible:
+        cycle, _ = next(find_dependency_cycles(G))
+        print("Error: the modules cannot be ordered, they contain a dependency cycle: "
+              + ' -> '.join(cycle + cycle[:1]), file=sys.stderr)
+        sys.exit(1)
+    
+    if args.auto_install and modules and not args.upgrade:
+        plan['auto_installed'] = sorted(compute_install_closure(G, modules)[1])
+    if args.cost:
+        plan['cost'] = estimate_import_cost(G, plan['order'])
+    not_installable = [module for module in plan['order'] if not G.nodes[module].get('installable', True)]
+    if not_installable:
+        print(f"Warning: the plan contains modules that are not installable: {', '.join(not_installable)}",
+              file=sys.stderr)
+    
+    if args.format == 'json':
+        text = json.dumps({
+            'modules': len(plan['order']),
+            'critical_path_length': len(plan['waves']),
+            **plan,
+        }, indent=2) + '\n'
+    else:
+        lines = [f"Install order ({len(plan['order'])} modules):"]
+        lines += [f"  {position}. {module}" for position, module in enumerate(plan['order'], 1)]
+        lines.append(f"\nParallel install waves ({len(plan['waves'])}):")
+        lines += [f"  Wave {index}: {', '.join(wave)}" for index, wave in enumerate(plan['waves'], 1)]
+        lines.append(f"\nCritical path ({len(plan['critical_path'])} modules): "
+                     + ' -> '.join(plan['critical_path']))
+        if 'auto_installed' in plan:
+            lines.append(f"\nPulled in by auto_install ({len(plan['auto_installed'])}): "
+                         + (', '.join(plan['auto_installed']) or '-'))
+        if 'cost' in plan:
+            cost = plan['cost']
+            lines.append(f"\nImport cost: {cost['python_files']} Python files, "
+                         f"{cost['python_bytes'] / 1024:.1f} KiB")
+            lines.append(f"External Python packages: {', '.join(cost['external_python']) or '-'}")
+            lines.append(f"External executables: {', '.join(cost['external_bin']) or '-'}")
+        text = '\n'.join(lines) + '\n'
+    write_command_output(text, args.output)
+
+
+def export_command(argv):
+    """Export the dependency graph as JSON, GraphML or an edge list."""
+    parser = argparse.ArgumentParser(
+        prog='odoo_module_dependency_graph.py export',
+        description='Export the dependency graph, with the module metadata, for other tools '
+                    'and for the query command.',
+        epilog='Examples:\n'
+               '  odoo_module_dependency_graph.py export -p /path/to/addons -o graph.json\n'
+               '  odoo_module_dependency_graph.py export -c /etc/odoo/odoo.conf -o graph.graphml',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_graph_source_arguments(parser)
+    parser.add_argument('--output', '-o', required=True,
+                        help='File to write; the format is guessed from its extension '
+                             f"({', '.join(GRAPH_FILE_FORMATS)})")
+    parser.add_argument('--format', '-f', choices=sorted(set(GRAPH_FILE_FORMATS.values())),
+                        help='Export format, overriding the file extension')
+    args = parser.parse_args(argv)
+    
+    G, _ = load_graph(args)
+    try:
+        export_graph(G, args.output, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Exported {len(G)} modules and {len(G.edges())} dependencies to {args.output}")
+
+
+def query_command(argv):
+    """Answer dependency questions from an exported graph or the addons tree."""
+    parser = argparse.ArgumentParser(
+        prog='odoo_module_dependency_graph.py query',
+        description='Answer dependency questions. Without a query on the command line, '
+                    'queries are read from stdin, one per line.',
+        epilog='Queries:\n'
+               + ''.join(f"  {' '.join([name] + arguments):<28}{description}\n"
+                         for name, (arguments, description) in QUERIES.items())
+               + '\nExamples:\n'
+               '  odoo_module_dependency_graph.py query -g graph.json dependents sale\n'
+               '  odoo_module_dependency_graph.py query -g graph.json path website_sale base\n'
+               '  odoo_module_dependency_graph.py query -p /path/to/addons breaks mail',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_graph_source_arguments(parser, graph_file=True)
+    parser.add_argument('--format', '-f', choices=['text', 'json'], default='text',
+                        help='Output format of the answers (default: text)')
+    parser.add_argument('query', nargs='*', help='Query and its arguments, e.g. "dependents sale"')
+    args = parser.parse_args(argv)
+    
+    G = load_command_graph(args)
+    
+    def answer(words):
+        result = answer_query(G, words)
+        print(json.dumps(result) if args.format == 'json' else format_query_answer(result), flush=True)
+    
+    if args.query:
+        try:
+            answer(args.query)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    interactive = sys.stdin.isatty()
+    if interactive:
+        print(f"{len(G)} modules loaded. Queries: {', '.join(QUERIES)}; 'quit' to exit.")
+    while True:
+        try:
+            line = input('> ' if interactive else '')
+        except EOFError:
+            break
+        words = shlex.split(line, comments=True)
+        if not words:
+            continue
+        if words[0] in ('quit', 'exit'):
+            break
+        try:
+            answer(words)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+
+
+def impact_command(argv):
+    """Print the modules affected by a set of changed files."""
+    parser = argparse.ArgumentParser(
+        prog='odoo_module_dependency_graph.py impact',
+        description='Map changed files to their modules and print those modules and all their '
+                    'dependents: the modules whose tests a change can affect.',
+        epilog='Examples:\n'
+               '  odoo_module_dependency_graph.py impact -p /path/to/addons --git origin/17.0...HEAD\n'
+               '  git diff --name-only HEAD~3 | odoo_module_dependency_graph.py impact -g graph.json -\n'
+               '  odoo_module_dependency_graph.py impact -p /path/to/addons sale/models/sale_order.py -f comma',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_graph_source_arguments(parser, graph_file=True)
+    parser.add_argument('--git', metavar='RANGE',
+                        help='Add the files of "git diff --name-only RANGE" to the changed files')
+    parser.add_argument('--repository', default='.',
+                        help='Git repository used with --git (default: current directory)')
+    parser.add_argument('--format', '-f', choices=['text', 'comma', 'json'], default='text',
+                        help='Output format: one module per line, a comma separated list '
+                             '(for odoo-bin -u / --test-tags) or JSON (default: text)')
+    parser.add_argument('files', nargs='*',
+                        help="Changed files; '-' reads file names from stdin, one per line")
+    args = parser.parse_args(argv)
+    
+    changed_files = []
+    for file_path in args.files:
+        if file_path == '-':
+            changed_files += [line.strip() for line in sys.stdin if line.strip()]
+        else:
+            changed_files.append(file_path)
+    if args.git:
+        try:
+            changed_files += git_changed_files(args.git, args.repository)
+        except (OSError, subprocess.CalledProcessError) as e:
+            detail = getattr(e, 'stderr', None) or e
+            print(f"Error: git diff failed: {str(detail).strip()}", file=sys.stderr)
+            sys.exit(1)
+    
+    G = load_command_graph(args)
+    
+    changed_modules, unowned_files = modules_of_files(G, changed_files)
+    affected_modules = sorted(compute_impact(G, changed_modules))
+    for file_path in unowned_files:
+        print(f"Warning: {file_path} does not belong to any module of the graph", file=sys.stderr)
+    
+    if args.format == 'json':
+        print(json.dumps({
+            'changed_files': len(changed_files),
+            'changed_modules': sorted(changed_modules),
+            'affected_modules': affected_modules,
+            'unowned_files': unowned_files,
+        }, indent=2))
+    elif args.format == 'comma':
+        print(','.join(affected_modules))
+    else:
+        for module in affected_modules:
+            print(module)
+    print(f"{len(changed_modules)} changed module(s), {len(affected_modules)} affected.", file=sys.stderr)
+
+
+def adjacency_command(argv):
+    """Write a filtered adjacency list of the modules."""
+    parser = argparse.ArgumentParser(
+        prog='odoo_module_dependency_graph.py adjacency',
+        description='Stream the adjacency list of the modules, optionally limited to the '
+                    'neighbourhood of a module or to highly connected modules.',
+        epilog='Examples:\n'
+               '  odoo_module_dependency_graph.py adjacency -p /path/to/addons -f csv -o modules.csv\n'
+               '  odoo_module_dependency_graph.py adjacency -p /path/to/addons --root sale --depth 2\n'
+               '  odoo_module_dependency_graph.py adjacency -g graph.json --min-fan-in 20 -f jsonl',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_graph_source_arguments(parser, graph_file=True)
+    parser.add_argument('--format', '-f', choices=['text', 'csv', 'jsonl'], default='text',
+                        help='Output format (default: text)')
+    parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+    parser.add_argument('--root', help='Only list the modules around this module')
+    parser.add_argument('--depth', type=int, default=None,
+                        help='With --root, the number of dependency levels listed on each side (default: all)')
+    parser.add_argument('--min-fan-in', type=int, default=0,
+                        help='Only list modules used by at least this many modules')
+    parser.add_argument('--min-fan-out', type=int, default=0,
+                        help='Only list modules depending on at least this many modules')
+    args = parser.parse_args(argv)
+    
+    G = load_command_graph(args)
+    if args.root is not None and args.root not in G:
+        print(f"Error: module '{args.root}' not found in the dependency graph", file=sys.stderr)
+        sys.exit(1)
+    
+    with contextlib.redirect_stdout(sys.stderr) if args.output else contextlib.nullcontext():
+        generate_adjacency_list(G, args.output, args.format, root=args.root, max_depth=args.depth,
+                                min_fan_in=args.min_fan_in, min_fan_out=args.min_fan_out)
+
+
+def metrics_command(argv):
+    """Write the structural metrics of every module as a CSV or JSON table."""
+    columns = ['module', 'fan_in', 'fan_out', 'transitive_dependents', 'transitive_dependencies',
+               'depth', 'betweenness', 'scc', 'scc_size']
+    parser = argparse.ArgumentParser(
+        prog='odoo_module_dependency_graph.py metrics',
+        description='Compute fan-in/fan-out, transitive dependents ("blast radius") and '
+                    'dependencies, dependency depth, betweenness centrality and strongly '
+                    'connected components of every module.',
+        epilog='Examples:\n'
+               '  odoo_module_dependency_graph.py metrics -p /path/to/addons -o metrics.csv\n'
+               '  odoo_module_dependency_graph.py metrics -g graph.json --sort betweenness --top 20\n'
+               '  odoo_module_dependency_graph.py metrics -c /etc/odoo/odoo.conf -f json',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_graph_source_arguments(parser, graph_file=True)
+    parser.add_argument('--format', '-f', choices=['csv', 'json'], default='csv',
+                        help='Output format (default: csv)')
+    parser.add_argument('--output', '-o', help='Write the table to this file instead of stdout')
+    parser.add_argument('--sort', choices=columns, default='transitive_dependents',
+                        help='Column sorting the table, largest first (default: transitive_dependents)')
+    parser.add_argument('--top', type=int, default=None, help='Only keep the first N rows')
+    parser.add_argument('--betweenness-samples', type=int, default=BETWEENNESS_SAMPLES, metavar='K',
+                        help='Estimate betweenness from K sampled modules on larger graphs, '
+                             f'0 for the exact value (default: {BETWEENNESS_SAMPLES})')
+    args = parser.parse_args(argv)
+    
+    G = load_command_graph(args)
+    
+    metrics = compute_module_metrics(G, args.betweenness_samples)
+    # Module names sort ascending, the metrics largest first
+    if args.sort == 'module':
+        metrics.sort(key=lambda row: row['module'])
+    else:
+        metrics.sort(key=lambda row: (-row[args.sort], row['module']))
+    if args.top is not None:
+        metrics = metrics[:args.top]
+    
+    if args.format == 'json':
+        text = json.dumps(metrics, indent=2) + '\n'
+    else:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(metrics)
+        text = buffer.getvalue()
+    write_command_output(text, args.output)
+
+
+def cycles_command(argv):
+    """Report the dependency cycles, exiting with status 1 if there is any."""
+    parser = argparse.ArgumentParser(
+        prog='odoo_module_dependency_graph.py cycles',
+        description='Check the modules for dependency cycles: one shortest cycle is reported '
+                    'per strongly connected component. Exits with status 1 if a cycle is found, '
+                    'so it can gate CI.',
+        epilog='Examples:\n'
+               '  odoo_module_dependency_graph.py cycles -p /path/to/addons\n'
+               '  odoo_module_dependency_graph.py cycles -g graph.json --format jsonl --max-cycles 10',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_graph_source_arguments(parser, graph_file=True)
+    parser.add_argument('--format', '-f', choices=['text', 'jsonl'], default='text',
+                        help='Output format (default: text)')
+    parser.add_argument('--max-cycles', type=int, default=100,
+                        help='Stop after reporting this many cycles, 0 for no limit (default: 100)')
+    args = parser.parse_args(argv)
+    
+    G = load_command_graph(args)
+    
+    count = 0
+    for cycle, component in find_dependency_cycles(G):
+        count += 1
+        if args.format == 'jsonl':
+            print(json.dumps({'cycle': cycle, 'component': component}), flush=True)
+        else:
+            print(' -> '.join(cycle + cycle[:1])
+                  + (f"  ({len(component)} modules in the cycle group)" if len(component) > len(cycle) else ''),
+                  flush=True)
+        if args.max_cycles and count >= args.max_cycles:
+            print(f"Stopped after {count} cycles (--max-cycles).", file=sys.stderr)
+            break
+    
+    if count:
+        print(f"Found {count} dependency cycle(s).", file=sys.stderr)
+        sys.exit(1)
+    print("No dependency cycle found.", file=sys.stderr)
+
+
+def check_deps_command(argv):
+    """Report missing, undeclared and redundant module dependencies."""
+    parser = argparse.ArgumentParser(
+        prog='odoo_module_dependency_graph.py check-deps',
+        description='Parse the Python files of every module and compare what they import '
+                    '(odoo.addons.X) and extend (_inherit, _inherits) with the declared '
+                    'dependencies. Exits with status 1 if a dependency is missing or undeclared.',
+        epilog='Examples:\n'
+               '  odoo_module_dependency_graph.py check-deps -p /path/to/addons\n'
+               '  odoo_module_dependency_graph.py check-deps -c /etc/odoo/odoo.conf -m sale,crm -f jsonl\n'
+               '  odoo_module_dependency_graph.py check-deps -p /path/to/addons --no-redundant',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_graph_source_arguments(parser)
+    parser.add_argument('--module-name', '-m', action='append', default=[],
+                        help='Only report these modules (comma separated, repeatable); default: all modules')
+    parser.add_argument('--no-redundant', action='store_true',
+                        help='Do not report dependencies implied by another declared dependency')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Processes parsing the Python files (default: number of CPUs)')
+    parser.add_argument('--format', '-f', choices=['text', 'jsonl'], default='text',
+                        help='Output format (default: text)')
+    args = parser.parse_args(argv)
+    
+    with contextlib.redirect_stdout(sys.stderr):
+        G, addons_paths = load_graph(args)
+        cache_path = None if args.no_cache else default_scan_cache_path(addons_paths)
+        module_scans = scan_module_files(G, cache_path, rebuild=args.rebuild_cache, jobs=args.processes)
+    
+    modules = {name.strip() for value in args.module_name for name in value.split(',') if name.strip()}
+    issues = [
+        issue for issue in check_module_dependencies(G, module_scans)
+        if (not modules or issue['module'] in modules)
+        and not (args.no_redundant and issue['issue'] == 'redundant')
+    ]
+    for issue in issues:
+        if args.format == 'jsonl':
+            print(json.dumps(issue))
+        else:
+            print(f"{issue['module']}: {issue['issue']} dependency '{issue['dependency']}' ({issue['reason']})")
+    
+    errors = sum(1 for issue in issues if issue['issue'] != 'redundant')
+    print(f"{errors} missing or undeclared dependencies, {len(issues) - errors} redundant.", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+
+# Subcommands of the script, each taking the remaining command line arguments
+COMMANDS = {
+    'install-order': install_order_command,
+    'export': export_command,
+    'query': query_command,
+    'impact': impact_command,
+    'adjacency': adjacency_command,
+    'metrics': metrics_command,
+    'cycles': cycles_command,
+    'check-deps': check_deps_command,
+}
+
+
 def main():
+    # Subcommands; without one, the script draws the graph as it always did
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description='Generate an Odoo module dependency graph.',
         epilog='Examples:\n'
                '  odoo_module_dependency_graph.py -p /path/to/addons -m all\n'
-               '  odoo_module_dependency_graph.py -p /path/to/addons -m module_name',
+               '  odoo_module_dependency_graph.py -p /path/to/addons -m module_name\n'
+               '  odoo_module_dependency_graph.py -p /odoo/addons,/custom/addons -m module_name\n'
+               '  odoo_module_dependency_graph.py -c /etc/odoo/odoo.conf -m all\n'
+               '  odoo_module_dependency_graph.py -p /path/to/addons -m sale,crm,stock --render-jobs 8\n'
+               '\nCommands (run "<command> -h" for their options):\n'
+               + ''.join(f'  {name}\n' for name in COMMANDS),
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
-    parser.add_argument('--path', '-p', required=True,
-                        help='Path to the Odoo addons directory (required)')
-    parser.add_argument('--module-name', '-m', required=True,
-                        help="Module name to analyze, or 'all' to generate full graph of all modules (required)")
+    add_graph_source_arguments(parser)
+    parser.add_argument('--module-name', '-m', action='append', required=True,
+                        help="Module name to analyze, or 'all' to generate full graph of all modules (required); "
+                             "repeat it or separate names with commas to draw the subgraphs of several modules")
     parser.add_argument('--output', '-o', help='Output file name for the graph (without extension)')
     parser.add_argument('--output-dir', '-d', help='Directory to save output files (defaults to addons directory)')
     parser.add_argument('--format', '-f', choices=['svg', 'pdf', 'png'], default='svg', 
                         help='Output format for the graph visualization (default: svg)')
     parser.add_argument('--list', '-t', help='Output file path for the text adjacency list')
+    parser.add_argument('--list-format', choices=['text', 'csv', 'jsonl'], default='text',
+                        help='Format of the adjacency list (default: text)')
+    parser.add_argument('--large-graph', choices=['auto', 'always', 'never'], default='auto',
+                        help='Large-graph mode (transitive reduction, sfdp layout): '
+                             'auto enables it above --large-graph-threshold nodes (default: auto)')
+    parser.add_argument('--large-graph-threshold', type=int, default=LARGE_GRAPH_THRESHOLD,
+                        help=f'Node count above which a graph is drawn in large-graph mode '
+                             f'(default: {LARGE_GRAPH_THRESHOLD})')
+    parser.add_argument('--collapse', choices=['repository', 'category'],
+                        help='Draw one node per repository (addons directory) or manifest category')
+    parser.add_argument('--engine', choices=['dot', 'sfdp', 'neato', 'fdp'],
+                        help='Graphviz layout engine, overriding the automatic choice')
+    parser.add_argument('--render-jobs', type=int, default=None,
+                        help='Graphviz processes rendering the graphs in parallel (default: number of CPUs)')
+    parser.add_argument('--force-render', action='store_true',
+                        help='Render every graph, even those whose DOT content did not change')
 
     args = parser.parse_args()
+    module_names = list(dict.fromkeys(
+        name.strip() for value in args.module_name for name in value.split(',') if name.strip()
+    ))
+    render_options = {
+        'large_graph': {'auto': None, 'always': True, 'never': False}[args.large_graph],
+        'collapse': args.collapse,
+        'engine': args.engine,
+        'threshold': args.large_graph_threshold,
+    }
 
-    # Validate directory path
-    dir_path = os.path.abspath(args.path)
-    if not os.path.isdir(dir_path):
-        print(f"Error: '{dir_path}' is not a valid directory.")
-        print("\nUsage:")
-        print("  python odoo_module_dependency_graph.py -p <addons_path> -m <module_name|all>")
-        print("\nExamples:")
-        print("  python odoo_module_dependency_graph.py -p /path/to/addons -m all")
-        print("  python odoo_module_dependency_graph.py -p /path/to/addons -m module_name")
-        sys.exit(1)
-
-    # If output directory is not specified, use the addons directory
-    output_dir = args.output_dir if args.output_dir else dir_path
+    G_full, addons_paths = load_graph(args)
 
-    print(f"\nSearching for manifest files in {dir_path}...")
-    manifest_files = find_manifest_files(dir_path)
-    print(f"Found {len(manifest_files)} manifest files.")
-
-    if not manifest_files:
-        print(f"Warning: No '__manifest__.py' files found in {dir_path}. Is this an Odoo addons directory?")
-        print("Exiting.")
-        sys.exit(1)
-
-    print("\nCreating dependency graph...")
-    G_full = create_dependency_graph(manifest_files)
+    # If output directory is not specified, use the (first) addons directory
+    output_dir = args.output_dir if args.output_dir else addons_paths[0]
 
     # Handle -m all case: generate only the full graph
-    if args.module_name.lower() == 'all':
+    if any(name.lower() == 'all' for name in module_names):
         output_name = args.output or 'odoo_dependency_graph'
         
         if args.list:
@@ -325,10 +2111,11 @@ def main():
             if not os.path.isabs(list_path):
                 list_path = os.path.join(output_dir, list_path)
             print(f"Generating adjacency list to {list_path}...")
-            generate_adjacency_list(G_full, list_path)
+            generate_adjacency_list(G_full, list_path, args.list_format)
         
         print(f"Visualizing full dependency graph (format: {args.format})...")
-        dot_path, output_path = visualize_with_graphviz(G_full, output_name, output_dir, args.format)
+        dot_path, output_path = visualize_with_graphviz(G_full, output_name, output_dir, args.format,
+                                                       force=args.force_render, **render_options)
         
         print("\nFiles generated:")
         print(f"- DOT file: {dot_path}")
@@ -338,44 +2125,48 @@ def main():
         print("\nDone!")
         return
 
-    # Handle specific module: generate full graph + subgraphs
-    module_name = args.module_name
+    # Handle specific modules: generate full graph + subgraphs of each module
+    missing_modules = [module for module in module_names if module not in G_full]
+    for module in missing_modules:
+        print(f"Warning: module '{module}' not found in the dependency graph, skipping it.")
+    module_names = [module for module in module_names if module not in missing_modules]
     
     # Save the full dependency graph first
     print(f"\nSaving the full dependency graph (format: {args.format})...")
     full_output_name = args.output or 'odoo_dependency_graph'
-    dot_path_full, output_path_full = visualize_with_graphviz(G_full, full_output_name, output_dir, args.format)
-    print(f"- DOT file (full): {dot_path_full}")
-    if output_path_full:
-        print(f"- {args.format.upper()} file (full): {output_path_full}")
-
-    # Extract and save the dependents subgraph (modules that depend on this one)
-    print(f"\nExtracting dependents subgraph for module '{module_name}' (modules that depend on it)...")
-    G_dependents = get_dependents_subgraph(G_full, module_name)
-    dependents_output_name = f"{module_name}_dependents"
-    
-    if len(G_dependents.nodes()) > 0:
-        dot_path_dependents, output_path_dependents = visualize_with_graphviz(G_dependents, dependents_output_name, output_dir, args.format)
-        print(f"- DOT file (dependents): {dot_path_dependents}")
-        if output_path_dependents:
-            print(f"- {args.format.upper()} file (dependents): {output_path_dependents}")
-    else:
-        print(f"No modules found that depend on '{module_name}'.")
-        output_path_dependents = None
-
-    # Extract and save the dependencies subgraph (modules that this one depends on)
-    print(f"\nExtracting dependencies subgraph for module '{module_name}' (modules it depends on)...")
-    G_dependencies = get_dependencies_subgraph(G_full, module_name)
-    dependencies_output_name = f"{module_name}_dependencies"
-    
-    if len(G_dependencies.nodes()) > 0:
-        dot_path_dependencies, output_path_dependencies = visualize_with_graphviz(G_dependencies, dependencies_output_name, output_dir, args.format)
-        print(f"- DOT file (dependencies): {dot_path_dependencies}")
-        if output_path_dependencies:
-            print(f"- {args.format.upper()} file (dependencies): {output_path_dependencies}")
-    else:
-        print(f"Module '{module_name}' has no dependencies.")
-        output_path_dependencies = None
+    targets = [(G_full, full_output_name)]
+    descriptions = ['full']
+    subgraphs = {}
+    
+    for module_name in module_names:
+        # Extract the dependents subgraph (modules that depend on this one)
+        print(f"\nExtracting dependents subgraph for module '{module_name}' (modules that depend on it)...")
+        G_dependents = get_dependents_subgraph(G_full, module_name)
+        if len(G_dependents.nodes()) > 0:
+            targets.append((G_dependents, f"{module_name}_dependents"))
+            descriptions.append(f"dependents of {module_name}")
+        else:
+            print(f"No modules found that depend on '{module_name}'.")
+        
+        # Extract the dependencies subgraph (modules that this one depends on)
+        print(f"Extracting dependencies subgraph for module '{module_name}' (modules it depends on)...")
+        G_dependencies = get_dependencies_subgraph(G_full, module_name)
+        if len(G_dependencies.nodes()) > 0:
+            targets.append((G_dependencies, f"{module_name}_dependencies"))
+            descriptions.append(f"dependencies of {module_name}")
+        else:
+            print(f"Module '{module_name}' has no dependencies.")
+        subgraphs[module_name] = (G_dependents, G_dependencies)
+    
+    # Draw every graph, then render the changed ones concurrently
+    print()
+    results = visualize_many(targets, output_dir, args.format, jobs=args.render_jobs,
+                             force=args.force_render, **render_options)
+    print("\nFiles generated:")
+    for description, (dot_path, output_path) in zip(descriptions, results):
+        print(f"- DOT file ({description}): {dot_path}")
+        if output_path:
+            print(f"- {args.format.upper()} file ({description}): {output_path}")
 
     # Generate adjacency lists if requested
     if args.list:
@@ -383,20 +2174,24 @@ def main():
         if not os.path.isabs(list_path):
             list_path = os.path.join(output_dir, list_path)
         
-        # Generate adjacency list for dependents if they exist
-        if len(G_dependents.nodes()) > 0:
-            dependents_list_path = list_path.replace('.txt', '_dependents.txt') if list_path.endswith('.txt') else f"{list_path}_dependents"
-            print(f"Generating dependents adjacency list to {dependents_list_path}...")
-            generate_adjacency_list(G_dependents, dependents_list_path)
-        
-        # Generate adjacency list for dependencies if they exist
-        if len(G_dependencies.nodes()) > 0:
-            dependencies_list_path = list_path.replace('.txt', '_dependencies.txt') if list_path.endswith('.txt') else f"{list_path}_dependencies"
-            print(f"Generating dependencies adjacency list to {dependencies_list_path}...")
-            generate_adjacency_list(G_dependencies, dependencies_list_path)
+        for module_name, (G_dependents, G_dependencies) in subgraphs.items():
+            # With several modules, their names keep the lists apart
+            prefix = f"_{module_name}" if len(subgraphs) > 1 else ''
+            
+            # Generate adjacency list for dependents if they exist
+            if len(G_dependents.nodes()) > 0:
+                dependents_list_path = list_path.replace('.txt', f'{prefix}_dependents.txt') if list_path.endswith('.txt') else f"{list_path}{prefix}_dependents"
+                print(f"Generating dependents adjacency list to {dependents_list_path}...")
+                generate_adjacency_list(G_dependents, dependents_list_path, args.list_format)
+            
+            # Generate adjacency list for dependencies if they exist
+            if len(G_dependencies.nodes()) > 0:
+                dependencies_list_path = list_path.replace('.txt', f'{prefix}_dependencies.txt') if list_path.endswith('.txt') else f"{list_path}{prefix}_dependencies"
+                print(f"Generating dependencies adjacency list to {dependencies_list_path}...")
+                generate_adjacency_list(G_dependencies, dependencies_list_path, args.list_format)
 
     print("\nDone!")
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,69 @@
+import textwrap
+
+from find_orpahn_functions import extract_js_references, extract_references_with_ast, extract_xml_references
+
+
+def test_ast_references_skip_self_recursion():
+    references = extract_references_with_ast(textwrap.dedent('''
+        class Partner(models.Model):
+            total = fields.Float(compute='_compute_total')
+
+            def _walk(self, depth):
+                return self._walk(depth - 1) if depth else 0
+
+            def write(self, vals):
+                return super().write(vals)
+
+            def action_open(self):
+                return getattr(self, 'action_view')()
+    '''))
+    assert '_walk' not in references
+    assert {'_compute_total', 'write', 'action_view'} <= references
+
+
+def test_ast_references_of_invalid_source():
+    assert extract_references_with_ast('def broken(:') is None
+
+
+def test_xml_references(tmp_path):
+    xml_file = tmp_path / 'views.xml'
+    xml_file.write_text(textwrap.dedent('''\
+        <odoo>
+            <record id="view_form" model="ir.ui.view">
+                <field name="arch" type="xml">
+                    <form>
+                        <button name="action_confirm" type="object"/>
+                        <a name="action_open" type="object">Open</a>
+                        <field name="amount" on_change="_onchange_amount(amount)"/>
+                        <span t-esc="doc._get_label()"/>
+                    </form>
+                </field>
+            </record>
+            <function model="res.partner" name="_init_partners"/>
+            <record id="cron_cleanup" model="ir.cron">
+                <field name="code">model._cron_cleanup()</field>
+            </record>
+        </odoo>
+    '''), encoding='utf-8')
+    references = extract_xml_references(str(xml_file))
+    assert {'action_confirm', 'action_open', '_onchange_amount', '_get_label',
+            '_init_partners', '_cron_cleanup'} <= references
+    # Record ids, models and plain field names are not method calls
+    assert not {'view_form', 'cron_cleanup', 'partner', 'arch'} & references
+
+
+def test_xml_references_of_malformed_file(tmp_path):
+    xml_file = tmp_path / 'broken.xml'
+    xml_file.write_text('<odoo><button name="action_confirm">', encoding='utf-8')
+    assert extract_xml_references(str(xml_file)) is None
+
+
+def test_js_references():
+    content = textwrap.dedent('''
+        await this.orm.call("sale.order", "action_confirm", [ids]);
+        await this.orm.silent.call(this.props.resModel, 'get_views', []);
+        rpc({model: 'res.partner', method: `name_search`});
+        fetch('/web/dataset/call_kw/account.move/action_post');
+        const method = "not_a_call";
+    ''')
+    assert extract_js_references(content) == {'action_confirm', 'get_views', 'name_search', 'action_post'}
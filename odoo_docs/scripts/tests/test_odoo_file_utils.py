@@ -0,0 +1,55 @@
+import os
+
+from odoo_file_utils import IgnoreRules, walk_files
+
+
+def make_tree(root, paths):
+    for path in paths:
+        full_path = root / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text('', encoding='utf-8')
+
+
+def relative_files(root, **options):
+    return [os.path.relpath(path, root).replace(os.sep, '/') for path in walk_files(str(root), **options)]
+
+
+def test_walk_prunes_default_directories(tmp_path):
+    make_tree(tmp_path, ['sale/models/sale.py', 'sale/static/lib/jquery.js', 'sale/static/src/app.js',
+                         'sale/i18n/fr.po', 'node_modules/pkg/index.js', '.git/config'])
+    assert relative_files(tmp_path) == ['sale/models/sale.py', 'sale/static/src/app.js']
+
+
+def test_walk_honors_ignore_files(tmp_path):
+    make_tree(tmp_path, ['keep.py', 'build/out.py', 'sale/generated.py', 'sale/models.py', 'sale/vendor/lib.py'])
+    (tmp_path / '.gitignore').write_text('# build output\nbuild/\ngenerated.py\n', encoding='utf-8')
+    (tmp_path / 'sale' / '.odooignore').write_text('vendor\n!generated.py\n', encoding='utf-8')
+    # The rules of a subdirectory come last, so its negation wins
+    assert relative_files(tmp_path, extensions=('.py',)) == ['keep.py', 'sale/generated.py', 'sale/models.py']
+    # Files of a directory come before its subdirectories
+    assert relative_files(tmp_path, extensions=('.py',), use_ignore_rules=False) == [
+        'keep.py', 'build/out.py', 'sale/generated.py', 'sale/models.py', 'sale/vendor/lib.py']
+
+
+def test_ignore_rules_anchored_and_directory_only(tmp_path):
+    (tmp_path / '.gitignore').write_text('/data\nsale/tests/\n*.log\n', encoding='utf-8')
+    rules = IgnoreRules().extended(str(tmp_path))
+    assert rules.is_ignored(str(tmp_path / 'data'), is_dir=True)
+    assert not rules.is_ignored(str(tmp_path / 'sale' / 'data'), is_dir=True)
+    assert rules.is_ignored(str(tmp_path / 'sale' / 'tests'), is_dir=True)
+    assert not rules.is_ignored(str(tmp_path / 'sale' / 'tests'), is_dir=False)
+    assert rules.is_ignored(str(tmp_path / 'deep' / 'run.log'), is_dir=False)
+
+
+def test_walk_include_and_exclude(tmp_path):
+    make_tree(tmp_path, ['sale/models/sale.py', 'sale/tests/test_sale.py', 'stock/models/stock.py'])
+    assert relative_files(tmp_path, exclude=('*/tests',)) == ['sale/models/sale.py', 'stock/models/stock.py']
+    assert relative_files(tmp_path, include=('sale/*',)) == ['sale/models/sale.py', 'sale/tests/test_sale.py']
+
+
+def test_walk_stops_at_module_roots(tmp_path):
+    make_tree(tmp_path, ['sale/__manifest__.py', 'sale/tests/nested/__manifest__.py', 'repo/stock/__manifest__.py'])
+    options = {'file_names': ('__manifest__.py',), 'stop_at_files': ('__manifest__.py',)}
+    assert relative_files(tmp_path, **options) == ['repo/stock/__manifest__.py', 'sale/__manifest__.py']
+    assert relative_files(tmp_path, max_depth=1, **options) == ['sale/__manifest__.py']
+    assert relative_files(tmp_path, jobs=4, **options) == relative_files(tmp_path, **options)
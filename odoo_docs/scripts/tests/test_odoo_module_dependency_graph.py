@@ -0,0 +1,139 @@
+import networkx as nx
+import pytest
+
+from odoo_module_dependency_graph import (
+    compute_closures, compute_install_closure, compute_module_metrics, find_dependency_cycles,
+    find_modules_in_paths, graph_from_modules, module_attributes, plan_install_order, transitive_reduction,
+)
+
+# Edges go from a module to its dependencies; mail and bus depend on each other
+EDGES = [
+    ('sale', 'account'), ('sale', 'mail'), ('account', 'mail'), ('mail', 'base'),
+    ('mail', 'bus'), ('bus', 'mail'), ('stock', 'base'),
+]
+# The same modules without the cycle
+TREE_EDGES = [
+    ('sale', 'account'), ('sale', 'mail'), ('account', 'base'), ('mail', 'base'), ('stock', 'base'),
+]
+
+
+def test_dependencies_closures():
+    closures = compute_closures(nx.DiGraph(EDGES), ['sale', 'stock', 'missing'])
+    assert closures == {
+        'sale': {'sale', 'account', 'mail', 'bus', 'base'},
+        'stock': {'stock', 'base'},
+    }
+
+
+def test_dependents_closures():
+    G = nx.DiGraph(EDGES)
+    closures = compute_closures(G, ['mail', 'base'], direction='dependents')
+    assert closures['mail'] == {'mail', 'bus', 'account', 'sale'}
+    assert closures['base'] == set(G)
+
+
+def test_closures_match_descendants():
+    G = nx.gnp_random_graph(60, 0.05, seed=1, directed=True)
+    closures = compute_closures(G, G.nodes())
+    for node in G:
+        assert closures[node] == nx.descendants(G, node) | {node}
+
+
+def test_closures_unknown_direction():
+    with pytest.raises(ValueError):
+        compute_closures(nx.DiGraph(EDGES), ['sale'], direction='sideways')
+
+
+def write_manifest(module_path, depends=()):
+    module_path.mkdir(parents=True)
+    (module_path / '__manifest__.py').write_text(repr({'name': module_path.name, 'depends': list(depends)}),
+                                                 encoding='utf-8')
+
+
+def test_addons_paths_shadowing(tmp_path):
+    for module in ('z_repo/dup', 'a_repo/dup', 'unlisted/hidden', 'top'):
+        write_manifest(tmp_path / module)
+    # Like an addons_path listing a directory before two of its subdirectories
+    addons_paths = [str(tmp_path), str(tmp_path / 'z_repo'), str(tmp_path / 'a_repo')]
+    manifest_files, duplicates = find_modules_in_paths(addons_paths, max_depth=1)
+    assert sorted(manifest_files) == [str(tmp_path / 'top' / '__manifest__.py'),
+                                      str(tmp_path / 'z_repo' / 'dup' / '__manifest__.py')]
+    assert duplicates == {'dup': [str(tmp_path / 'z_repo' / 'dup' / '__manifest__.py'),
+                                  str(tmp_path / 'a_repo' / 'dup' / '__manifest__.py')]}
+
+
+def test_install_order_waves():
+    plan = plan_install_order(nx.DiGraph(TREE_EDGES))
+    assert plan['waves'] == [['base'], ['account', 'mail', 'stock'], ['sale']]
+    assert plan['order'] == ['base', 'account', 'mail', 'stock', 'sale']
+    assert plan['critical_path'] == ['base', 'account', 'sale']
+
+
+def test_install_order_of_selected_modules():
+    G = nx.DiGraph(TREE_EDGES)
+    assert plan_install_order(G, ['account'])['order'] == ['base', 'account']
+    assert plan_install_order(G, ['mail'], upgrade=True)['order'] == ['mail', 'sale']
+
+
+def test_install_order_with_cycle():
+    with pytest.raises(nx.NetworkXUnfeasible):
+        plan_install_order(nx.DiGraph(EDGES))
+
+
+def test_transitive_reduction_keeps_attributes():
+    G = nx.DiGraph(EDGES)
+    G.add_edge('sale', 'base', weight=5)
+    G.edges['sale', 'account']['weight'] = 2
+    reduced = transitive_reduction(G)
+    assert set(reduced.nodes()) == set(G.nodes())
+    assert set(reduced.edges()) == set(EDGES) - {('sale', 'mail')}
+    assert reduced.edges['sale', 'account']['weight'] == 2
+
+
+def test_module_attributes_ignore_malformed_external_dependencies(capsys):
+    attributes = module_attributes('/addons/sale/__manifest__.py', {
+        'depends': ['base'], 'auto_install': True, 'external_dependencies': ['lxml'],
+    })
+    assert attributes['external_dependencies'] == {}
+    assert 'external_dependencies' in capsys.readouterr().out
+    assert attributes['auto_install_triggers'] == ['base']
+
+
+def test_install_closure_pulls_auto_install_modules():
+    G = graph_from_modules([
+        (name, depends, module_attributes(f'/addons/{name}/__manifest__.py', manifest))
+        for name, depends, manifest in [
+            ('base', [], {}),
+            ('sale', ['base'], {}),
+            ('stock', ['base'], {}),
+            ('sale_stock', ['sale', 'stock', 'delivery'], {'auto_install': ['sale', 'stock']}),
+            ('delivery', ['base'], {}),
+        ]
+    ])
+    assert compute_install_closure(G, ['sale']) == ({'base', 'sale'}, set())
+    assert compute_install_closure(G, ['sale', 'stock']) == (
+        {'base', 'sale', 'stock', 'sale_stock', 'delivery'}, {'sale_stock', 'delivery'})
+
+
+def test_module_metrics():
+    metrics = {row['module']: row for row in compute_module_metrics(nx.DiGraph(EDGES))}
+    assert metrics['base']['fan_in'] == 2
+    assert metrics['base']['transitive_dependents'] == 5
+    assert metrics['base']['depth'] == 0
+    assert metrics['sale']['transitive_dependencies'] == 4
+    assert metrics['sale']['transitive_dependents'] == 0
+    # The modules of a cycle share one component and count as one level
+    assert metrics['mail']['scc'] == metrics['bus']['scc']
+    assert metrics['mail']['scc_size'] == 2
+    assert metrics['mail']['transitive_dependencies'] == 2
+    assert [metrics[module]['depth'] for module in ('mail', 'account', 'sale')] == [1, 2, 3]
+
+
+def test_find_dependency_cycles():
+    G = nx.DiGraph(EDGES + [('x', 'y'), ('y', 'z'), ('z', 'x'), ('x', 'z'), ('loop', 'loop')])
+    assert list(find_dependency_cycles(G)) == [
+        (['bus', 'mail'], ['bus', 'mail']),
+        (['loop'], ['loop']),
+        (['x', 'z'], ['x', 'y', 'z']),
+    ]
+    assert list(find_dependency_cycles(nx.DiGraph(TREE_EDGES))) == []